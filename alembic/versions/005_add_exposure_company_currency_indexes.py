@@ -0,0 +1,31 @@
+"""add composite company/currency indexes on exposures
+
+Revision ID: 005_add_exposure_company_currency_indexes
+Revises: 004_float_to_numeric_financial_fields
+Create Date: 2026-08-30 00:00:00.000000
+
+Rationale:
+  GET /api/exposure-data/exposures/{company_id} filters by company_id and
+  optionally by currency on either side of the pair. Without an index the
+  OR on from_currency/to_currency forces a table scan per request. These
+  composite indexes let PostgreSQL satisfy both branches with index range
+  scans.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '005_add_exposure_company_currency_indexes'
+down_revision = '004_float_to_numeric_financial_fields'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_exposure_company_from', 'exposures', ['company_id', 'from_currency'])
+    op.create_index('ix_exposure_company_to', 'exposures', ['company_id', 'to_currency'])
+
+
+def downgrade():
+    op.drop_index('ix_exposure_company_to', table_name='exposures')
+    op.drop_index('ix_exposure_company_from', table_name='exposures')
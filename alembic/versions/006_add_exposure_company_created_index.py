@@ -0,0 +1,27 @@
+"""add composite company/created_at index on exposures
+
+Revision ID: 006_add_exposure_company_created_index
+Revises: 005_add_exposure_company_currency_indexes
+Create Date: 2026-08-30 00:00:00.000000
+
+Rationale:
+  The recent-first exposure listing orders by created_at DESC per company.
+  Without an index that is a sequential scan plus sort on every call; the
+  composite index lets PostgreSQL serve it with a backward index scan.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '006_add_exposure_company_created_index'
+down_revision = '005_add_exposure_company_currency_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_exposure_company_created', 'exposures', ['company_id', 'created_at'])
+
+
+def downgrade():
+    op.drop_index('ix_exposure_company_created', table_name='exposures')
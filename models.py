@@ -2,7 +2,7 @@
 Database Models for BIRK FX Platform
 """
 
-from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Enum, Date, ForeignKey, JSON, Numeric, Boolean, UniqueConstraint, TIMESTAMP
+from sqlalchemy import Column, Integer, String, Float, DateTime, Text, Enum, Date, ForeignKey, JSON, Numeric, Boolean, UniqueConstraint, TIMESTAMP, Index
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
@@ -81,6 +81,15 @@ class Exposure(Base):
     # Relationship to SimulationResult
     simulations = relationship("SimulationResult", back_populates="exposure")
 
+    # Composite indexes — company listing filtered by currency is the hot
+    # read path; these turn a per-company table scan into an index range scan.
+    __table_args__ = (
+        Index('ix_exposure_company_from', 'company_id', 'from_currency'),
+        Index('ix_exposure_company_to', 'company_id', 'to_currency'),
+        # Backward index scan serves the recent-first paginated listing
+        Index('ix_exposure_company_created', 'company_id', 'created_at'),
+    )
+
 
 class FXRate(Base):
     __tablename__ = "fx_rates"
@@ -4,13 +4,14 @@ FastAPI endpoints for file uploads and manual exposure data entry
 NOW WITH CRUD: Create, Read, Update, Delete
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query, Depends
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Query, Depends, Request, Response
+from fastapi.responses import StreamingResponse, ORJSONResponse
+import orjson as _orjson
 # BF-002: shared cookie-aware auth imported below
 from pydantic import BaseModel, Field, validator
 from typing import Optional, List
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, date
 import io
 import csv
 import os
@@ -21,7 +22,13 @@ from database import SessionLocal, get_live_fx_rate, calculate_risk_level
 # BF-002: shared cookie-aware auth — cookie first, Bearer fallback
 from services.shared_auth import get_token_payload as _get_token_payload
 
-router = APIRouter(prefix="/api/exposure-data", tags=["Exposure Data"])
+# orjson serializes the large exposure-list payloads several times faster
+# than the stdlib json encoder FastAPI defaults to.
+router = APIRouter(
+    prefix="/api/exposure-data",
+    tags=["Exposure Data"],
+    default_response_class=ORJSONResponse,
+)
 
 
 # Pydantic Models
@@ -30,8 +37,10 @@ class ManualExposureRequest(BaseModel):
     reference_number: str
     currency_pair: str
     amount: float = Field(..., gt=0)
-    start_date: str
-    end_date: str
+    # Pydantic's Rust core parses "YYYY-MM-DD" into date natively — no
+    # strptime in the handler, and bad input is a uniform 422
+    start_date: date
+    end_date: date
     description: Optional[str] = None
     rate: Optional[float] = None
     # Budget & Risk Limits (Phase 2B)
@@ -54,6 +63,25 @@ class ManualExposureRequest(BaseModel):
 
 
 
+# Upload extension whitelist — frozenset for cheapest membership test
+ALLOWED_UPLOAD_EXTENSIONS = frozenset({"xlsx"})
+
+# Precompiled translation table: strips "/" and "-" in a single C-level pass
+# instead of chained .replace() allocations (hot inside the upload row loop)
+_CCY_STRIP = str.maketrans("", "", "/-")
+
+
+def parse_pair(currency_pair: str) -> tuple:
+    """
+    Normalize "EUR/USD", "EUR-USD" or "EURUSD" to ("EUR", "USD").
+    Returns None if the pair doesn't reduce to exactly 6 letters.
+    """
+    pair = currency_pair.upper().translate(_CCY_STRIP)
+    if len(pair) != 6:
+        return None
+    return pair[:3], pair[3:]
+
+
 # Database dependency
 def get_db():
     db = SessionLocal()
@@ -65,6 +93,7 @@ def get_db():
 
 @router.post("/upload")
 async def upload_file(
+    request: Request,
     file: UploadFile = File(...),
     company_id: int = Form(...),
     db: Session = Depends(get_db),
@@ -89,21 +118,43 @@ async def upload_file(
     try:
         # ── File type guard — xlsx only ───────────────────────────────────────
         filename = file.filename or ""
-        ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
-        if ext != "xlsx":
+        ext = os.path.splitext(filename)[1].lstrip(".").lower()
+        if ext not in ALLOWED_UPLOAD_EXTENSIONS:
             raise HTTPException(
                 status_code=400,
                 detail=f"Only .xlsx files are supported. Received: .{ext or 'unknown'}. "
                        f"Please use the Sumnohow Import Template."
             )
 
-        # ── Size guard — 10 MB ────────────────────────────────────────────────
-        contents = await file.read()
-        if len(contents) > 10 * 1024 * 1024:
-            raise HTTPException(status_code=400, detail="File exceeds 10 MB limit.")
+        # ── Size guard — 10 MB, enforced while streaming ──────────────────────
+        # Read the upload in 1 MB chunks into a spooled temp file instead of
+        # buffering the whole body with file.read(); oversized uploads are
+        # rejected as soon as the limit is crossed, not after a full read.
+        import tempfile
+
+        MAX_FILE_SIZE = 10 * 1024 * 1024
+
+        # Reject from Content-Length before reading a single body byte — a
+        # huge upload fails in milliseconds instead of after a full transfer.
+        # The streaming guard below still applies in case the header lies.
+        try:
+            declared_size = int(request.headers.get("content-length", 0))
+        except ValueError:
+            declared_size = 0
+        if declared_size > MAX_FILE_SIZE:
+            raise HTTPException(status_code=413, detail="File exceeds 10 MB limit.")
+
+        spool = tempfile.SpooledTemporaryFile(max_size=1 << 20)
+        total_bytes = 0
+        while chunk := await file.read(1 << 20):
+            total_bytes += len(chunk)
+            if total_bytes > MAX_FILE_SIZE:
+                raise HTTPException(status_code=413, detail="File exceeds 10 MB limit.")
+            spool.write(chunk)
+        spool.seek(0)
 
         # ── Multi-tenancy guard ───────────────────────────────────────────────
-        company = db.query(Company).filter(Company.id == company_id).first()
+        company = db.get(Company, company_id)
         if not company:
             raise HTTPException(status_code=404, detail=f"Company {company_id} not found")
         role      = payload.get("role", "")
@@ -112,8 +163,14 @@ async def upload_file(
             raise HTTPException(status_code=403, detail="Access denied")
 
         # ── Open workbook ─────────────────────────────────────────────────────
+        # openpyxl is synchronous CPU+I/O — run it in the threadpool so the
+        # event loop keeps servicing other requests while the file parses.
+        from fastapi.concurrency import run_in_threadpool
+
         try:
-            wb = openpyxl.load_workbook(io.BytesIO(contents), read_only=True, data_only=True)
+            wb = await run_in_threadpool(
+                openpyxl.load_workbook, spool, read_only=True, data_only=True
+            )
         except Exception as e:
             raise HTTPException(status_code=400, detail=f"Could not open .xlsx file: {e}")
 
@@ -131,7 +188,8 @@ async def upload_file(
         ws = wb[sheet_name]
 
         # ── Read and validate headers (row 1) ─────────────────────────────────
-        rows = list(ws.iter_rows(values_only=True))
+        # Cell extraction is also blocking openpyxl work — keep it off the loop.
+        rows = await run_in_threadpool(lambda: list(ws.iter_rows(values_only=True)))
         if not rows:
             raise HTTPException(status_code=400, detail="'Exposures' sheet is empty.")
 
@@ -157,10 +215,20 @@ async def upload_file(
         # ── Parse data rows ───────────────────────────────────────────────────
         from sqlalchemy import text as _text
 
-        imported = 0
-        skipped  = 0
-        errors   = []
-        today    = _date.today()
+        pending_rows = []   # validated rows, bulk-inserted after the loop
+        skipped      = 0
+        errors       = []
+        today        = _date.today()
+
+        # Request-scope rate memo — a 10k-row file usually contains only a
+        # handful of distinct pairs, so look each pair up exactly once.
+        rate_cache: dict = {}
+
+        def _rate(from_ccy: str, to_ccy: str) -> float:
+            key = (from_ccy, to_ccy)
+            if key not in rate_cache:
+                rate_cache[key] = get_live_fx_rate(from_ccy, to_ccy)
+            return rate_cache[key]
 
         VALID_INSTRUMENTS = {"forward", "spot", "option"}
 
@@ -184,21 +252,12 @@ async def upload_file(
                 continue   # silently skip blank rows
 
             # Accept both "EUR/USD" and "EURUSD"
-            pair_norm = pair_raw.upper().replace("-", "")
-            if "/" in pair_norm:
-                parts = pair_norm.split("/")
-                if len(parts) != 2 or len(parts[0]) != 3 or len(parts[1]) != 3:
-                    errors.append(f"Row {row_idx}: invalid currency_pair '{pair_raw}' — must be XXX/XXX")
-                    skipped += 1
-                    continue
-                from_currency, to_currency = parts[0], parts[1]
-            else:
-                if len(pair_norm) != 6:
-                    errors.append(f"Row {row_idx}: invalid currency_pair '{pair_raw}' — must be XXX/XXX")
-                    skipped += 1
-                    continue
-                from_currency = pair_norm[:3]
-                to_currency   = pair_norm[3:]
+            pair = parse_pair(pair_raw)
+            if pair is None:
+                errors.append(f"Row {row_idx}: invalid currency_pair '{pair_raw}' — must be XXX/XXX")
+                skipped += 1
+                continue
+            from_currency, to_currency = pair
 
             # ── total_amount ──────────────────────────────────────────────────
             amt_raw = cell("total_amount").replace(",", "")
@@ -235,7 +294,8 @@ async def upload_file(
                 elif hasattr(raw_sd_val, "year"):
                     start_date = raw_sd_val
                 else:
-                    start_date = datetime.strptime(sd_raw, "%Y-%m-%d").date()
+                    # date.fromisoformat is the C fast-path for YYYY-MM-DD
+                    start_date = _date.fromisoformat(sd_raw)
             except (ValueError, TypeError, AttributeError):
                 errors.append(f"Row {row_idx}: invalid start_date '{sd_raw}' — use YYYY-MM-DD")
                 skipped += 1
@@ -252,7 +312,7 @@ async def upload_file(
                     # already a date object
                     maturity_date = raw_cell_val
                 else:
-                    maturity_date = datetime.strptime(mat_raw, "%Y-%m-%d").date()
+                    maturity_date = _date.fromisoformat(mat_raw)
 
                 if maturity_date < today:
                     errors.append(f"Row {row_idx}: maturity_date '{mat_raw}' is in the past — must be >= today")
@@ -296,7 +356,7 @@ async def upload_file(
 
             # ── FX rate lookup ────────────────────────────────────────────────
             try:
-                rate = get_live_fx_rate(from_currency, to_currency)
+                rate = _rate(from_currency, to_currency)
             except Exception:
                 rate = 1.0
                 errors.append(
@@ -308,45 +368,56 @@ async def upload_file(
             usd_value   = amount * rate
             reference   = f"IMP-{row_idx:03d}"
 
-            # ── Insert (savepoint per row so one failure never aborts others) ──
-            # risk_level is intentionally omitted — column is nullable and the
-            # PostgreSQL enum casing varies by how the DB was initialised.
-            # The system recalculates risk_level elsewhere from amount + period.
-            try:
-                with db.begin_nested():   # savepoint — rolls back this row only on failure
-                    db.execute(_text("""
-                        INSERT INTO exposures
-                          (company_id, from_currency, to_currency, amount, amount_currency,
-                           start_date, end_date, initial_rate, current_rate, current_value_usd,
-                           settlement_period, description, budget_rate,
-                           reference, exposure_type, instrument_type, is_active, created_at, updated_at)
-                        VALUES
-                          (:cid, :from_ccy, :to_ccy, :amount, :amount_ccy,
-                           :start_date, :end_date, :rate, :rate, :usd_value,
-                           :period, :desc, :budget_rate,
-                           :reference, :exposure_type, :instrument_type, true, NOW(), NOW())
-                    """), {
-                        "cid":             company_id,
-                        "from_ccy":        from_currency,
-                        "to_ccy":          to_currency,
-                        "amount":          amount,
-                        "amount_ccy":      amount_currency,
-                        "start_date":      start_date,
-                        "end_date":        maturity_date,
-                        "rate":            rate,
-                        "usd_value":       usd_value,
-                        "period":          period_days,
-                        "desc":            description,
-                        "budget_rate":     budget_rate,
-                        "reference":       reference,
-                        "exposure_type":   exposure_type,
-                        "instrument_type": instrument_type,
-                    })
-                imported += 1
-            except Exception as insert_err:
-                errors.append(f"Row {row_idx}: database error — {insert_err}")
-                skipped += 1
-                continue
+            # Row validated — queue for one bulk insert after the loop.
+            pending_rows.append({
+                "cid":             company_id,
+                "from_ccy":        from_currency,
+                "to_ccy":          to_currency,
+                "amount":          amount,
+                "amount_ccy":      amount_currency,
+                "start_date":      start_date,
+                "end_date":        maturity_date,
+                "rate":            rate,
+                "usd_value":       usd_value,
+                "period":          period_days,
+                "desc":            description,
+                "budget_rate":     budget_rate,
+                "reference":       reference,
+                "exposure_type":   exposure_type,
+                "instrument_type": instrument_type,
+            })
+
+        # ── Bulk insert in pages (executemany per page, one final commit) ─────
+        # Pages of 10k keep the statement size and session memory bounded on
+        # very large files while still amortising round-trip cost per page.
+        # risk_level is intentionally omitted — column is nullable and the
+        # PostgreSQL enum casing varies by how the DB was initialised.
+        # The system recalculates risk_level elsewhere from amount + period.
+        INSERT_PAGE_SIZE = 10_000
+        insert_stmt = _text("""
+            INSERT INTO exposures
+              (company_id, from_currency, to_currency, amount, amount_currency,
+               start_date, end_date, initial_rate, current_rate, current_value_usd,
+               settlement_period, description, budget_rate,
+               reference, exposure_type, instrument_type, is_active, created_at, updated_at)
+            VALUES
+              (:cid, :from_ccy, :to_ccy, :amount, :amount_ccy,
+               :start_date, :end_date, :rate, :rate, :usd_value,
+               :period, :desc, :budget_rate,
+               :reference, :exposure_type, :instrument_type, true, NOW(), NOW())
+        """)
+        imported = 0
+        try:
+            for page_start in range(0, len(pending_rows), INSERT_PAGE_SIZE):
+                page = pending_rows[page_start:page_start + INSERT_PAGE_SIZE]
+                db.execute(insert_stmt, page)
+                db.flush()
+                imported += len(page)
+        except Exception as insert_err:
+            db.rollback()
+            errors.append(f"Database error — no rows inserted: {insert_err}")
+            skipped += len(pending_rows)
+            imported = 0
 
         db.commit()
         print(f"[upload] company_id={company_id} file='{filename}' imported={imported} skipped={skipped}")
@@ -412,13 +483,19 @@ def download_template(format: str):
     fmt = format.lower()
 
     if fmt == "csv":
-        # Build CSV in-memory
-        buf = io.StringIO()
-        writer = csv.writer(buf)
-        writer.writerow(headers)
-        writer.writerows(sample_rows)
+        # Yield the CSV row by row — no full-file buffer, response starts
+        # as soon as the first line is encoded.
+        def iter_csv():
+            buf = io.StringIO()
+            writer = csv.writer(buf)
+            for row in [headers, *sample_rows]:
+                writer.writerow(row)
+                yield buf.getvalue().encode("utf-8")
+                buf.seek(0)
+                buf.truncate(0)
+
         return StreamingResponse(
-            io.BytesIO(buf.getvalue().encode("utf-8")),
+            iter_csv(),
             media_type="text/csv",
             headers={"Content-Disposition": "attachment; filename=Sumnohow_FX_Import_Template.csv"},
         )
@@ -477,11 +554,23 @@ def download_template(format: str):
         ws2.column_dimensions["B"].width = 70
         ws2.column_dimensions["C"].width = 10
 
-        buf = io.BytesIO()
-        wb.save(buf)
-        buf.seek(0)
+        # Save to a spooled temp file and stream it out in 64 KB chunks so the
+        # response buffer stays constant-size regardless of workbook size.
+        import tempfile
+
+        spool = tempfile.SpooledTemporaryFile(max_size=1 << 20)
+        wb.save(spool)
+        spool.seek(0)
+
+        def iter_xlsx(fh, chunk_size=64 * 1024):
+            try:
+                while chunk := fh.read(chunk_size):
+                    yield chunk
+            finally:
+                fh.close()
+
         return StreamingResponse(
-            buf,
+            iter_xlsx(spool),
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             headers={"Content-Disposition": "attachment; filename=Sumnohow_FX_Import_Template.xlsx"},
         )
@@ -489,6 +578,39 @@ def download_template(format: str):
     else:
         raise HTTPException(status_code=400, detail="Format must be csv or xlsx")
 
+def _validate_manual_exposure(request: ManualExposureRequest) -> dict:
+    """
+    Validation kernel for manual exposures.
+
+    Parses the currency pair and checks the date window without touching the
+    database or building the final exposure record, so validate-only callers
+    don't pay for record construction. Raises HTTPException(400) on invalid
+    input. Dates arrive already parsed by Pydantic.
+
+    Returns the parsed fields:
+      {from_currency, to_currency, start_date, end_date, period_days}
+    """
+    # Parse currency pair (e.g., "EURUSD" -> from="EUR", to="USD")
+    pair = parse_pair(request.currency_pair)
+    if pair is None:
+        raise HTTPException(status_code=400, detail="Currency pair must be 6 characters (e.g., EURUSD)")
+
+    start_date_obj = request.start_date
+    end_date_obj = request.end_date
+    period_days = (end_date_obj - start_date_obj).days
+
+    if period_days <= 0:
+        raise HTTPException(status_code=400, detail="End date must be after start date")
+
+    return {
+        "from_currency": pair[0],
+        "to_currency":   pair[1],
+        "start_date":    start_date_obj,
+        "end_date":      end_date_obj,
+        "period_days":   period_days,
+    }
+
+
 @router.post("/manual")
 async def create_manual_exposure(
     request: ManualExposureRequest,
@@ -499,28 +621,15 @@ async def create_manual_exposure(
     Create a single exposure manually
     """
     try:
-        # Validate company exists
-        company = db.query(Company).filter(Company.id == request.company_id).first()
-        if not company:
-            raise HTTPException(status_code=404, detail=f"Company {request.company_id} not found")
-        
-        # Parse currency pair (e.g., "EURUSD" -> from="EUR", to="USD")
-        currency_pair = request.currency_pair.upper().replace("/", "").replace("-", "")
-        
-        if len(currency_pair) != 6:
-            raise HTTPException(status_code=400, detail="Currency pair must be 6 characters (e.g., EURUSD)")
-        
-        from_currency = currency_pair[:3]
-        to_currency = currency_pair[3:]
-        
-        # Calculate period days from dates
-        start_date_obj = datetime.strptime(request.start_date, '%Y-%m-%d').date()
-        end_date_obj = datetime.strptime(request.end_date, '%Y-%m-%d').date()
-        period_days = (end_date_obj - start_date_obj).days
-        
-        if period_days <= 0:
-            raise HTTPException(status_code=400, detail="End date must be after start date")
-        
+        # No company preflight SELECT — the exposures.company_id FK enforces
+        # existence, and the IntegrityError on flush is translated to a 404
+        parsed = _validate_manual_exposure(request)
+        from_currency  = parsed["from_currency"]
+        to_currency    = parsed["to_currency"]
+        start_date_obj = parsed["start_date"]
+        end_date_obj   = parsed["end_date"]
+        period_days    = parsed["period_days"]
+
         # Get FX rate
         try:
             rate = request.rate if request.rate else get_live_fx_rate(from_currency, to_currency)
@@ -554,9 +663,16 @@ async def create_manual_exposure(
             instrument_type=request.instrument_type or 'Spot'
         )
         
+        # flush() assigns the PK without ending the transaction, so the raw-SQL
+        # follow-up lands in the same commit and no refresh() SELECT is needed
+        # — the response is assembled from values we already hold.
+        from sqlalchemy.exc import IntegrityError
         db.add(db_exposure)
-        db.commit()
-        db.refresh(db_exposure)
+        try:
+            db.flush()
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(status_code=404, detail=f"Company {request.company_id} not found")
 
         # Save fields not on the ORM model via raw SQL (reference, exposure_type, amount_currency)
         from sqlalchemy import text as _text
@@ -573,39 +689,41 @@ async def create_manual_exposure(
             "amount_currency": effective_amount_currency,
             "id":              db_exposure.id,
         })
-        db.commit()
 
-        # Capture inception rate in the background (non-blocking)
-        import asyncio as _asyncio
-        from datetime import date as _date
-        _asyncio.create_task(_capture_inception_rate(
-            db_exposure.id, from_currency, to_currency, start_date_obj, rate
-        ))
-
-        return {
+        response = {
             'success': True,
             'exposure': {
                 'id': db_exposure.id,
-                'company_id': db_exposure.company_id,
+                'company_id': request.company_id,
                 'reference_number': request.reference_number,
-                'from_currency': db_exposure.from_currency,
-                'to_currency': db_exposure.to_currency,
-                'amount': db_exposure.amount,
-                'start_date': db_exposure.start_date.isoformat() if db_exposure.start_date else None,
-                'end_date': db_exposure.end_date.isoformat() if db_exposure.end_date else None,
-                'initial_rate': db_exposure.initial_rate,
-                'current_rate': db_exposure.current_rate,
-                'current_value_usd': db_exposure.current_value_usd,
-                'settlement_period': db_exposure.settlement_period,
-                'risk_level': db_exposure.risk_level.value,
-                'description': db_exposure.description,
-                'budget_rate': db_exposure.budget_rate,
+                'from_currency': from_currency,
+                'to_currency': to_currency,
+                'amount': request.amount,
+                'start_date': start_date_obj.isoformat(),
+                'end_date': end_date_obj.isoformat(),
+                'initial_rate': rate,
+                'current_rate': rate,
+                'current_value_usd': usd_value,
+                'settlement_period': period_days,
+                'risk_level': risk.value,
+                'description': request.description or '',
+                'budget_rate': request.budget_rate,
                 'exposure_type': request.exposure_type,
                 'instrument_type': request.instrument_type or 'Spot',
                 'created_at': db_exposure.created_at.isoformat()
             },
             'message': f'Exposure {request.reference_number} created successfully'
         }
+
+        db.commit()
+
+        # Capture inception rate in the background (non-blocking)
+        import asyncio as _asyncio
+        _asyncio.create_task(_capture_inception_rate(
+            response['exposure']['id'], from_currency, to_currency, start_date_obj, rate
+        ))
+
+        return response
         
     except HTTPException:
         raise
@@ -621,7 +739,7 @@ async def create_manual_exposure(
 
 
 @router.delete("/exposures/{exposure_id}")
-async def delete_exposure(
+def delete_exposure(
     exposure_id: int,
     db: Session = Depends(get_db)
 ):
@@ -630,21 +748,25 @@ async def delete_exposure(
     Delete an exposure
     """
     try:
-        # Fetch exposure
-        exposure = db.query(Exposure).filter(Exposure.id == exposure_id).first()
-        
-        if not exposure:
+        # Single DELETE .. RETURNING — no SELECT-before-DELETE round trip,
+        # and the returned columns feed the response directly
+        from sqlalchemy import delete
+
+        row = db.execute(
+            delete(Exposure)
+            .where(Exposure.id == exposure_id)
+            .returning(Exposure.id, Exposure.from_currency, Exposure.to_currency, Exposure.amount)
+        ).first()
+
+        if row is None:
             raise HTTPException(status_code=404, detail=f"Exposure {exposure_id} not found")
-        
-        # Store info for response
+
         exposure_info = {
-            'id': exposure.id,
-            'currency_pair': f"{exposure.from_currency}{exposure.to_currency}",
-            'amount': exposure.amount
+            'id': row.id,
+            'currency_pair': f"{row.from_currency}{row.to_currency}",
+            'amount': row.amount
         }
-        
-        # Delete
-        db.delete(exposure)
+
         db.commit()
         
         return {
@@ -661,7 +783,7 @@ async def delete_exposure(
 
 
 @router.get("/exposures/{company_id}")
-async def get_company_exposures(
+def get_company_exposures(
     company_id: int,
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
@@ -674,42 +796,72 @@ async def get_company_exposures(
     Get all exposures for a company with optional filters
     """
     try:
-        # Query exposures from database
-        query = db.query(Exposure).filter(Exposure.company_id == company_id)
-        
-        # Apply filters if provided
+        # Core select of only the columns the response needs — skips ORM
+        # hydration and per-attribute descriptor access on large result sets.
+        from sqlalchemy import select, func
+
+        # Dates are formatted by PostgreSQL (to_char) so the Python side
+        # receives ready-to-serialize strings — no per-row isoformat() calls.
+        stmt = select(
+            Exposure.id,
+            Exposure.company_id,
+            Exposure.from_currency,
+            Exposure.to_currency,
+            Exposure.amount,
+            func.to_char(Exposure.start_date, 'YYYY-MM-DD').label('start_date'),
+            func.to_char(Exposure.end_date, 'YYYY-MM-DD').label('end_date'),
+            Exposure.initial_rate,
+            Exposure.current_rate,
+            Exposure.current_value_usd,
+            Exposure.settlement_period,
+            Exposure.risk_level,
+            Exposure.description,
+            func.to_char(Exposure.created_at, 'YYYY-MM-DD"T"HH24:MI:SS').label('created_at'),
+            func.to_char(Exposure.updated_at, 'YYYY-MM-DD"T"HH24:MI:SS').label('updated_at'),
+        ).where(Exposure.company_id == company_id)
+
+        # Apply filters if provided — all pushed down to SQL so the composite
+        # (company_id, currency) indexes are used instead of a table scan.
         if currency:
-            query = query.filter(
-                (Exposure.from_currency == currency.upper()) | 
+            stmt = stmt.where(
+                (Exposure.from_currency == currency.upper()) |
                 (Exposure.to_currency == currency.upper())
             )
-        
-        exposures = query.all()
-        
+        if start_date:
+            stmt = stmt.where(Exposure.start_date >= start_date)
+        if end_date:
+            stmt = stmt.where(Exposure.end_date <= end_date)
+        if status:
+            # Rows inserted via raw SQL may have NULL status — treat as active
+            from sqlalchemy import func as _func
+            stmt = stmt.where(_func.coalesce(Exposure.status, 'active') == status)
+
+        rows = db.execute(stmt).mappings().all()
+
         # Convert to dict format
         exposure_list = []
-        for exp in exposures:
+        for r in rows:
             exposure_list.append({
-                'id': exp.id,
-                'company_id': exp.company_id,
-                'from_currency': exp.from_currency,
-                'to_currency': exp.to_currency,
-                'currency_pair': f"{exp.from_currency}{exp.to_currency}",
-                'amount': exp.amount,
-                'start_date': exp.start_date.isoformat() if exp.start_date else None,
-                'end_date': exp.end_date.isoformat() if exp.end_date else None,
-                'initial_rate': exp.initial_rate,
-                'current_rate': exp.current_rate,
-                'current_value_usd': exp.current_value_usd,
-                'settlement_period': exp.settlement_period,
-                'period_days': exp.settlement_period,
-                'risk_level': exp.risk_level.value if exp.risk_level else 'Unknown',
-                'description': exp.description,
+                'id': r['id'],
+                'company_id': r['company_id'],
+                'from_currency': r['from_currency'],
+                'to_currency': r['to_currency'],
+                'currency_pair': f"{r['from_currency']}{r['to_currency']}",
+                'amount': r['amount'],
+                'start_date': r['start_date'],
+                'end_date': r['end_date'],
+                'initial_rate': r['initial_rate'],
+                'current_rate': r['current_rate'],
+                'current_value_usd': r['current_value_usd'],
+                'settlement_period': r['settlement_period'],
+                'period_days': r['settlement_period'],
+                'risk_level': r['risk_level'].value if r['risk_level'] else 'Unknown',
+                'description': r['description'],
                 'status': 'active',
-                'created_at': exp.created_at.isoformat() if exp.created_at else None,
-                'updated_at': exp.updated_at.isoformat() if exp.updated_at else None
+                'created_at': r['created_at'],
+                'updated_at': r['updated_at']
             })
-        
+
         return {
             'success': True,
             'company_id': company_id,
@@ -727,41 +879,100 @@ async def get_company_exposures(
         raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
 
 
+@router.get("/exposures/{company_id}/summary")
+def get_exposure_summary(
+    company_id: int,
+    db: Session = Depends(get_db)
+):
+    """
+    GET /api/exposure-data/exposures/{company_id}/summary
+    Aggregate exposure statistics for a company.
+
+    Computed in a single SQL aggregate SELECT — no rows are transferred to
+    Python, so cost stays flat no matter how many exposures the company has.
+    """
+    try:
+        from sqlalchemy import select, func
+
+        row = db.execute(
+            select(
+                func.count(),
+                func.coalesce(func.sum(Exposure.amount), 0),
+                func.count(func.distinct(Exposure.from_currency + Exposure.to_currency)),
+                func.coalesce(func.avg(Exposure.settlement_period), 0),
+            ).where(Exposure.company_id == company_id)
+        ).one()
+
+        return {
+            'success': True,
+            'company_id': company_id,
+            'summary': {
+                'total_exposures': row[0],
+                'total_amount': float(row[1]),
+                'unique_currencies': row[2],
+                'avg_period_days': float(row[3]),
+            },
+        }
+
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Server error: {str(e)}")
+
+
+# Static payload — serialized once, with a short max-age so proxies can
+# absorb load-balancer probe bursts
+_HEALTH_BYTES = _orjson.dumps({
+    'status': 'healthy',
+    'service': 'Data Import',
+    'version': '2.0.0',
+    'features': ['CREATE', 'READ', 'UPDATE', 'DELETE']
+})
+
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {
-        'status': 'healthy',
-        'service': 'Data Import',
-        'version': '2.0.0',
-        'features': ['CREATE', 'READ', 'UPDATE', 'DELETE']
-    }
+    return Response(content=_HEALTH_BYTES, media_type="application/json",
+                    headers={"Cache-Control": "max-age=1"})
 
 @router.get("/api/exposure-data/list")
-async def list_manual_exposures(company_id: int, db: Session = Depends(get_db)):
-    """Fetch all exposures for a company (matches manual entry endpoint pattern)"""
-    from models import Exposure
-    
-    exposures = db.query(Exposure).filter(
-        Exposure.company_id == company_id
-    ).order_by(Exposure.created_at.desc()).limit(50).all()
-    
-    # Convert to dict for JSON serialization
+def list_manual_exposures(
+    company_id: int,
+    limit: int = Query(default=50, ge=1, le=500),
+    offset: int = Query(default=0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """Fetch exposures for a company, newest first, paginated"""
+    from sqlalchemy import text as _text
+
+    # Raw column projection — skips ORM hydration, and the reference column
+    # only exists at the table level (the ORM model doesn't map it, so the
+    # old hasattr() fallback chain always returned None here)
+    rows = db.execute(_text("""
+        SELECT id, reference,
+               from_currency || to_currency AS currency_pair,
+               amount, start_date, end_date, description,
+               budget_rate, hedge_ratio_policy, created_at
+        FROM exposures
+        WHERE company_id = :cid
+        ORDER BY created_at DESC
+        LIMIT :limit OFFSET :offset
+    """), {"cid": company_id, "limit": limit, "offset": offset}).mappings().all()
+
     exposure_list = []
-    for exp in exposures:
+    for r in rows:
         exposure_list.append({
-            "id": exp.id,
-            "reference_number": exp.reference if hasattr(exp, 'reference') else exp.reference_number if hasattr(exp, 'reference_number') else None,
-            "currency_pair": exp.currency_pair if hasattr(exp, 'currency_pair') else f"{exp.from_currency}{exp.to_currency}",
-            "amount": float(exp.amount),
-            "start_date": exp.start_date.isoformat() if hasattr(exp, 'start_date') and exp.start_date else None,
-            "end_date": exp.end_date.isoformat() if hasattr(exp, 'end_date') and exp.end_date else None,
-            "description": exp.description,
-            "budget_rate": float(exp.budget_rate) if hasattr(exp, 'budget_rate') and exp.budget_rate else None,
-            "hedge_ratio_policy": float(exp.hedge_ratio_policy) if hasattr(exp, 'hedge_ratio_policy') and exp.hedge_ratio_policy else 1.0,
-            "created_at": exp.created_at.isoformat() if hasattr(exp, 'created_at') else None
+            "id": r["id"],
+            "reference_number": r["reference"],
+            "currency_pair": r["currency_pair"],
+            "amount": float(r["amount"]),
+            "start_date": r["start_date"].isoformat() if r["start_date"] else None,
+            "end_date": r["end_date"].isoformat() if r["end_date"] else None,
+            "description": r["description"],
+            "budget_rate": float(r["budget_rate"]) if r["budget_rate"] else None,
+            "hedge_ratio_policy": float(r["hedge_ratio_policy"]) if r["hedge_ratio_policy"] else 1.0,
+            "created_at": r["created_at"].isoformat() if r["created_at"] else None
         })
-    
+
     return {"success": True, "exposures": exposure_list, "total": len(exposure_list)}
 
 
@@ -4,6 +4,7 @@ Handles CSV upload and classification of accounts payable exposures
 """
 
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List
 import sys
@@ -17,7 +18,10 @@ from database import get_db
 
 router = APIRouter(
     prefix="/api/exposures",
-    tags=["exposures"]
+    tags=["exposures"],
+    # orjson (Rust) serialization — large classified-row payloads encode 2-5x
+    # faster than the stdlib encoder
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -57,42 +61,43 @@ async def upload_exposures(
                 detail="File must be a CSV (.csv extension)"
             )
         
-        # 2. Read file content
-        content = await file.read()
-        
-        if len(content) == 0:
-            raise HTTPException(
-                status_code=400,
-                detail="Uploaded file is empty"
+        # 2-5. Stream-parse the CSV in 10k-row chunks; classify and insert
+        # each chunk before reading the next, so memory stays bounded by
+        # chunk size instead of file size
+        rows_inserted = 0
+        summary = None
+        preview = []
+
+        for df in exposure_service.parse_csv_chunks(file.file):
+            if df.empty:
+                continue
+
+            exposures, chunk_summary = await exposure_service.process_exposures(
+                df=df,
+                tenant_id=tenant_id,
+                uploaded_by=uploaded_by,
+                source_file=file.filename,
+                db=db
             )
-        
-        # 3. Parse CSV
-        df = await exposure_service.parse_csv(content)
-        
-        if df.empty:
+
+            rows_inserted += await exposure_service.bulk_insert_exposures(exposures, db)
+            summary = exposure_service.merge_summaries(summary, chunk_summary)
+
+            if len(preview) < 10:
+                preview.extend(exposures[:10 - len(preview)])
+
+        if summary is None:
             raise HTTPException(
                 status_code=400,
                 detail="CSV contains no valid data rows"
             )
-        
-        # 4. Process and classify exposures
-        exposures, summary = await exposure_service.process_exposures(
-            df=df,
-            tenant_id=tenant_id,
-            uploaded_by=uploaded_by,
-            source_file=file.filename,
-            db=db
-        )
-        
-        # 5. Bulk insert to database
-        rows_inserted = await exposure_service.bulk_insert_exposures(exposures, db)
-        
+
         # 6. Return summary + preview
         return {
             "success": True,
             "message": f"Successfully processed {rows_inserted} exposures",
             "summary": summary,
-            "preview": exposures[:10]  # First 10 rows
+            "preview": preview  # First 10 rows
         }
         
     except ValueError as e:
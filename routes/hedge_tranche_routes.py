@@ -49,7 +49,16 @@ def resolve_company_id(requested_id: int, payload: dict) -> int:
 
 # ── Auto-migrate tables on first use ─────────────────────────────────────────
 
+# The CREATE TABLE IF NOT EXISTS statements are idempotent but still cost two
+# round trips and a commit — once they have succeeded in this process there is
+# no reason to re-run them on every tranche request.
+_tables_ensured = False
+
+
 def ensure_tables(db: Session):
+    global _tables_ensured
+    if _tables_ensured:
+        return
     db.execute(text("""
         CREATE TABLE IF NOT EXISTS hedge_tranches (
             id                  SERIAL PRIMARY KEY,
@@ -90,6 +99,7 @@ def ensure_tables(db: Session):
         )
     """))
     db.commit()
+    _tables_ensured = True
 
 
 # ── Helper: normalize amount to base currency ────────────────────────────────
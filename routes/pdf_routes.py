@@ -1,16 +1,77 @@
 import asyncio
+import hashlib
+import time
 import sqlalchemy as sa
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from fastapi.responses import Response
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from database import get_db
 from services.pdf_service import generate_currency_plan_pdf
 
 router = APIRouter()
 
+# Company name / base currency / active policy change rarely compared to how
+# often reports are downloaded — cache the header per company, same
+# hand-rolled TTL pattern as the rate cache in database.py. Settings
+# mutations call invalidate_plan_header(), but that only reaches this
+# process; other workers serve their cached header until the deadline, so
+# the TTL stays short enough to cap the stale window at a few seconds.
+_PLAN_HEADER_TTL = 5.0
+_plan_header_cache: dict = {}
+
+
+def invalidate_plan_header(company_id: int = None) -> None:
+    """Drop this worker's cached report header for one company, or all."""
+    if company_id is None:
+        _plan_header_cache.clear()
+    else:
+        _plan_header_cache.pop(company_id, None)
+
+
+def _get_plan_header(db: Session, company_id: int) -> tuple:
+    """(company_name, base_currency, active_policy) with a short TTL cache."""
+    cached = _plan_header_cache.get(company_id)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    active_policy = None
+    try:
+        # LEFT JOIN keeps the company row when no policy is active
+        co_row = db.execute(
+            sa.text(
+                "SELECT c.name, c.base_currency, "
+                "       p.id AS policy_id, p.policy_name, "
+                "       p.hedge_ratio_over_5m, p.hedge_ratio_1m_to_5m, p.hedge_ratio_under_1m "
+                "FROM companies c "
+                "LEFT JOIN hedging_policies p "
+                "  ON p.company_id = c.id AND p.is_active = true "
+                "WHERE c.id = :cid LIMIT 1"
+            ),
+            {"cid": company_id}
+        ).fetchone()
+        company_name  = co_row._mapping["name"]         if co_row else "BIRK Commodities A/S"
+        base_currency = (co_row._mapping.get("base_currency") or "USD") if co_row else "USD"
+        if co_row and co_row._mapping.get("policy_id") is not None:
+            pm = co_row._mapping
+            active_policy = {
+                "id":                    pm["policy_id"],
+                "name":                  pm.get("policy_name") or "Balanced",
+                "hedge_ratio_over_5m":   pm.get("hedge_ratio_over_5m", 0.85),
+                "hedge_ratio_1m_to_5m":  pm.get("hedge_ratio_1m_to_5m", 0.65),
+                "hedge_ratio_under_1m":  pm.get("hedge_ratio_under_1m", 0.45),
+            }
+    except Exception:
+        company_name  = "BIRK Commodities A/S"
+        base_currency = "USD"
+
+    header = (company_name, base_currency, active_policy)
+    _plan_header_cache[company_id] = (time.monotonic() + _PLAN_HEADER_TTL, header)
+    return header
+
 
 @router.get("/api/reports/currency-plan")
-async def get_currency_plan(company_id: int = Query(1), db: Session = Depends(get_db)):
+async def get_currency_plan(request: Request, company_id: int = Query(1), db: Session = Depends(get_db)):
     from birk_api import fetch_fx_rate
 
     # ── Fetch active, non-archived exposures ────────────────────────────────
@@ -24,17 +85,8 @@ async def get_currency_plan(company_id: int = Query(1), db: Session = Depends(ge
         {"cid": company_id}
     ).fetchall()
 
-    # ── Fetch company name and base currency ─────────────────────────────────
-    try:
-        co_row = db.execute(
-            sa.text("SELECT name, base_currency FROM companies WHERE id = :cid LIMIT 1"),
-            {"cid": company_id}
-        ).fetchone()
-        company_name  = co_row._mapping["name"]         if co_row else "BIRK Commodities A/S"
-        base_currency = (co_row._mapping.get("base_currency") or "USD") if co_row else "USD"
-    except Exception:
-        company_name  = "BIRK Commodities A/S"
-        base_currency = "USD"
+    # ── Company name, base currency and active policy (cached, short TTL) ────
+    company_name, base_currency, active_policy = _get_plan_header(db, company_id)
 
     # ── Fetch USD pivot rates for base-currency conversion ───────────────────
     # from_ccy/base = (from_ccy/USD) / (base/USD)  — avoids stale cross-rate cache
@@ -70,6 +122,19 @@ async def get_currency_plan(company_id: int = Query(1), db: Session = Depends(ge
         if not isinstance(rate_val, Exception) and rate_val is not None:
             live_spot[pair] = float(rate_val)
 
+    # ── Fetch executed/confirmed tranches for all exposures in one query ─────
+    # One IN-list round-trip instead of a SELECT per exposure (N+1)
+    tranches_by_exposure: dict = {}
+    exposure_ids = [row._mapping["id"] for row in rows]
+    if exposure_ids:
+        all_tranches = db.execute(sa.text("""
+            SELECT exposure_id, amount, rate FROM hedge_tranches
+            WHERE exposure_id = ANY(:eids)
+              AND status IN ('executed', 'confirmed')
+        """), {"eids": exposure_ids}).fetchall()
+        for t in all_tranches:
+            tranches_by_exposure.setdefault(t._mapping["exposure_id"], []).append(t)
+
     # ── Build exposure list with actual tranche data ─────────────────────────
     exposures = []
     for row in rows:
@@ -89,12 +154,7 @@ async def get_currency_plan(company_id: int = Query(1), db: Session = Depends(ge
         else:
             total_amount = raw_amount
 
-        # Fetch actual executed/confirmed tranches
-        tranche_rows = db.execute(sa.text("""
-            SELECT amount, rate FROM hedge_tranches
-            WHERE exposure_id = :eid
-              AND status IN ('executed', 'confirmed')
-        """), {"eid": exp_id}).fetchall()
+        tranche_rows = tranches_by_exposure.get(exp_id, [])
 
         actual_hedged  = sum(float(t._mapping["amount"] or 0) for t in tranche_rows)
         actual_hedge_ratio = (actual_hedged / total_amount) if total_amount > 0 else 0.0
@@ -136,25 +196,7 @@ async def get_currency_plan(company_id: int = Query(1), db: Session = Depends(ge
             "end_date":           str(m["end_date"]) if m["end_date"] else "TBC",
         })
 
-    # ── Fetch active policy ──────────────────────────────────────────────────
-    policy_row = db.execute(
-        sa.text(
-            "SELECT * FROM hedging_policies "
-            "WHERE company_id = :cid AND is_active = true LIMIT 1"
-        ),
-        {"cid": company_id}
-    ).fetchone()
-
-    active_policy = None
-    if policy_row:
-        pm = policy_row._mapping
-        active_policy = {
-            "id":                    pm["id"],
-            "name":                  pm.get("policy_name") or pm.get("name") or "Balanced",
-            "hedge_ratio_over_5m":   pm.get("hedge_ratio_over_5m", 0.85),
-            "hedge_ratio_1m_to_5m":  pm.get("hedge_ratio_1m_to_5m", 0.65),
-            "hedge_ratio_under_1m":  pm.get("hedge_ratio_under_1m", 0.45),
-        }
+    if active_policy:
         print(f"[currency-plan] policy='{active_policy['name']}' "
               f">5M={active_policy['hedge_ratio_over_5m']:.0%} "
               f"1-5M={active_policy['hedge_ratio_1m_to_5m']:.0%} "
@@ -188,8 +230,21 @@ async def get_currency_plan(company_id: int = Query(1), db: Session = Depends(ge
                 "action":             action,
             })
 
+    # ── ETag over the report inputs ──────────────────────────────────────────
+    # Exposures, tranches, rates and policy are all reflected in the built
+    # dicts; if none of them changed since the client's last download, skip
+    # the expensive PDF render and return 304.
+    etag = '"%s"' % hashlib.sha1(
+        repr((company_name, base_currency, exposures, recommendations, active_policy)).encode()
+    ).hexdigest()
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+
     # ── Generate and return PDF ──────────────────────────────────────────────
-    pdf_bytes = generate_currency_plan_pdf(
+    # Rendering is CPU-bound; run it on a worker thread so this async handler
+    # doesn't stall the event loop for the duration of the report build
+    pdf_bytes = await run_in_threadpool(
+        generate_currency_plan_pdf,
         exposures, recommendations, active_policy, company_name, base_currency
     )
 
@@ -197,6 +252,7 @@ async def get_currency_plan(company_id: int = Query(1), db: Session = Depends(ge
         content=pdf_bytes,
         media_type="application/pdf",
         headers={
+            "ETag": etag,
             "Content-Disposition":
                 f"attachment; filename=currency-plan-{company_id}.pdf"
         }
@@ -3,31 +3,60 @@ Settings Routes — Company, Bank, Policy, Notifications
 Auth functions inlined — no external auth_utils dependency.
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Response
 # BF-002: shared cookie-aware auth imported below
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only, raiseload
 from sqlalchemy import text
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
 import asyncio
 import os
+import time
 import httpx
 
 from models import Company, Exposure, PolicyAuditLog
 from database import SessionLocal
+from routes.pdf_routes import invalidate_plan_header
 
 router = APIRouter(prefix="/api/settings", tags=["Settings"])
 
-APPROVED_PAIRS = {
+APPROVED_PAIRS = frozenset({
     "EUR/USD","GBP/USD","USD/JPY","USD/CHF","AUD/USD","USD/CAD","NZD/USD",
     "EUR/GBP","EUR/JPY","EUR/CHF","EUR/AUD","EUR/CAD",
     "GBP/JPY","GBP/CHF","AUD/JPY","CHF/JPY","AUD/NZD",
     "EUR/NOK","EUR/SEK","GBP/NOK","GBP/SEK","NOK/SEK",
     "USD/MXN","USD/CNY","USD/BRL","USD/ZAR",
     "USD/INR","USD/TRY","USD/NOK","USD/SEK"
+})
+
+# APPROVED_PAIRS never changes at runtime, so the sorted list and the
+# majors/minors/crosses/exotics partition are computed once at import
+# instead of re-sorting on every request
+_APPROVED_PAIRS_SORTED = sorted(APPROVED_PAIRS)
+_EXOTICS = sorted(["USD/MXN","USD/CNY","USD/BRL","USD/ZAR","USD/INR","USD/TRY","USD/NOK","USD/SEK"])
+_MAJORS = sorted([p for p in APPROVED_PAIRS if "USD" in p and "/" in p and len(p) == 7 and p not in set(_EXOTICS)])
+_NOK_SEK = sorted([p for p in APPROVED_PAIRS if "NOK" in p or "SEK" in p])
+_MINORS = sorted([p for p in APPROVED_PAIRS if p not in _MAJORS and p not in _NOK_SEK and p not in _EXOTICS])
+_APPROVED_PAIRS_PAYLOAD = {
+    "majors": _MAJORS, "minors": _MINORS, "nok_sek_crosses": _NOK_SEK,
+    "liquid_exotics": _EXOTICS, "total": len(APPROVED_PAIRS),
 }
 
+# Settings change on human timescales but the dashboard polls GET /settings
+# constantly — cache the assembled payload per company, same hand-rolled TTL
+# pattern as the rate cache in database.py. Invalidation below is per-process:
+# with WEB_CONCURRENCY=4 the other workers keep serving their cached copy
+# until the deadline passes, so the TTL is kept short enough that a save is
+# visible everywhere within a few seconds.
+_SETTINGS_TTL = 5.0
+_settings_cache: dict = {}
+
+
+def _invalidate_settings(company_id: int) -> None:
+    """Drop this worker's cached GET /settings payload after a mutation."""
+    _settings_cache.pop(company_id, None)
+
 def get_db():
     db = SessionLocal()
     try:
@@ -128,6 +157,8 @@ def _seed_default_policies(db, company_id: int) -> None:
              :budget_breach_threshold_pct, :opportunistic_trigger_threshold, :trailing_stop_trigger, :is_active)
         """), p)
     db.commit()
+    invalidate_plan_header(company_id)
+    _invalidate_settings(company_id)
     print(f"[settings] Auto-seeded default policies for company_id={company_id}")
 
 # ── Endpoints ────────────────────────────────────────────────────
@@ -240,25 +271,52 @@ def update_risk_settings(
 
 
 @router.get("/{company_id}")
-def get_settings(company_id: int, db: Session = Depends(get_db), payload: dict = Depends(get_token_payload)):
+def get_settings(company_id: int, response: Response, db: Session = Depends(get_db), payload: dict = Depends(get_token_payload)):
     safe_id = resolve_company_id(company_id, payload)
-    company = db.query(Company).filter(Company.id == safe_id).first()
-    if not company:
+    cached = _settings_cache.get(safe_id)
+    if cached and cached[0] > time.monotonic():
+        response.headers["X-Cache"] = "HIT"
+        return cached[1]
+    # One round trip: company row (including alert prefs) LEFT JOINed to the
+    # active policy, explicit columns only. Policy columns come back with a
+    # p_ prefix and are stripped into the active_policy dict below.
+    row = db.execute(text("""
+        SELECT c.id, c.name, c.base_currency, c.trading_volume_monthly,
+               c.default_exposure_direction, c.bank_name, c.bank_contact_name, c.bank_email,
+               c.alert_email, c.daily_digest, c.mc_alert_threshold_pct, c.mc_alert_recipients,
+               p.id AS p_id, p.company_id AS p_company_id, p.policy_name AS p_policy_name,
+               p.policy_type AS p_policy_type,
+               p.hedge_ratio_over_5m AS p_hedge_ratio_over_5m,
+               p.hedge_ratio_1m_to_5m AS p_hedge_ratio_1m_to_5m,
+               p.hedge_ratio_under_1m AS p_hedge_ratio_under_1m,
+               p.material_exposure_threshold AS p_material_exposure_threshold,
+               p.de_minimis_threshold AS p_de_minimis_threshold,
+               p.budget_breach_threshold_pct AS p_budget_breach_threshold_pct,
+               p.opportunistic_trigger_threshold AS p_opportunistic_trigger_threshold,
+               p.trailing_stop_trigger AS p_trailing_stop_trigger,
+               p.is_active AS p_is_active,
+               p.defensive_ratio AS p_defensive_ratio,
+               p.opportunistic_ratio AS p_opportunistic_ratio,
+               p.adverse_trigger_pct AS p_adverse_trigger_pct,
+               p.favourable_trigger_pct AS p_favourable_trigger_pct,
+               p.zone_auto_apply AS p_zone_auto_apply,
+               p.zone_notify_email AS p_zone_notify_email,
+               p.zone_notify_inapp AS p_zone_notify_inapp
+        FROM companies c
+        LEFT JOIN hedging_policies p ON p.company_id = c.id AND p.is_active = true
+        WHERE c.id = :cid
+        LIMIT 1
+    """), {"cid": safe_id}).fetchone()
+    if not row:
         raise HTTPException(status_code=404, detail="Company not found")
-    policy = db.execute(text("SELECT * FROM hedging_policies WHERE company_id = :cid AND is_active = true"), {"cid": safe_id}).fetchone()
-    p = dict(policy._mapping) if policy else {}
-    # Alert prefs — stored directly on companies row
-    mc_row = db.execute(
-        text("SELECT mc_alert_threshold_pct, mc_alert_recipients FROM companies WHERE id = :cid"),
-        {"cid": safe_id},
-    ).fetchone()
-    mc = mc_row._mapping if mc_row else {}
-    return {
-        "company": {"id": company.id, "name": company.name, "base_currency": company.base_currency,
-                    "trading_volume_monthly": company.trading_volume_monthly,
-                    "default_exposure_direction": getattr(company, 'default_exposure_direction', None) or 'payable'},
-        "bank": {"bank_name": company.bank_name, "bank_contact_name": company.bank_contact_name, "bank_email": company.bank_email},
-        "notifications": {"alert_email": company.alert_email, "daily_digest": company.daily_digest},
+    mc = row._mapping
+    p = {k[2:]: v for k, v in mc.items() if k.startswith("p_")} if mc["p_id"] is not None else {}
+    result = {
+        "company": {"id": mc["id"], "name": mc["name"], "base_currency": mc["base_currency"],
+                    "trading_volume_monthly": mc["trading_volume_monthly"],
+                    "default_exposure_direction": mc["default_exposure_direction"] or 'payable'},
+        "bank": {"bank_name": mc["bank_name"], "bank_contact_name": mc["bank_contact_name"], "bank_email": mc["bank_email"]},
+        "notifications": {"alert_email": mc["alert_email"], "daily_digest": mc["daily_digest"]},
         "active_policy": p if p else None,
         "zone_config": {
             "defensive_ratio":       p.get("defensive_ratio", 0.75),
@@ -273,8 +331,11 @@ def get_settings(company_id: int, db: Session = Depends(get_db), payload: dict =
             "mc_alert_threshold_pct": float(mc.get("mc_alert_threshold_pct") or 2.0),
             "mc_alert_recipients":    mc.get("mc_alert_recipients") or "all",
         },
-        "approved_pairs": sorted(list(APPROVED_PAIRS))
+        "approved_pairs": _APPROVED_PAIRS_SORTED
     }
+    _settings_cache[safe_id] = (time.monotonic() + _SETTINGS_TTL, result)
+    response.headers["X-Cache"] = "MISS"
+    return result
 
 @router.put("/{company_id}/company")
 def update_company_settings(company_id: int, request: CompanySettingsRequest, db: Session = Depends(get_db), payload: dict = Depends(get_token_payload)):
@@ -293,6 +354,8 @@ def update_company_settings(company_id: int, request: CompanySettingsRequest, db
         company.default_exposure_direction = val
     company.updated_at = datetime.utcnow()
     db.commit()
+    invalidate_plan_header(safe_id)  # name/base_currency feed the cached report header
+    _invalidate_settings(safe_id)
     return {"success": True, "message": "Company settings updated"}
 
 @router.put("/{company_id}/bank")
@@ -306,6 +369,7 @@ def update_bank_settings(company_id: int, request: BankSettingsRequest, db: Sess
     if request.bank_email is not None: company.bank_email = request.bank_email
     company.updated_at = datetime.utcnow()
     db.commit()
+    _invalidate_settings(safe_id)
     return {"success": True, "message": "Bank settings updated"}
 
 @router.put("/{company_id}/notifications")
@@ -318,6 +382,7 @@ def update_notification_settings(company_id: int, request: NotificationSettingsR
     if request.daily_digest is not None: company.daily_digest = request.daily_digest
     company.updated_at = datetime.utcnow()
     db.commit()
+    _invalidate_settings(safe_id)
     return {"success": True, "message": "Notification settings updated"}
 
 @router.put("/{company_id}/alerts")
@@ -336,6 +401,7 @@ def update_alert_prefs(company_id: int, request: AlertPrefsRequest, db: Session
     updates["cid"] = safe_id
     db.execute(text(f"UPDATE companies SET {set_clause} WHERE id = :cid"), updates)
     db.commit()
+    _invalidate_settings(safe_id)
     return {"success": True, "message": "Alert preferences updated"}
 
 async def _background_zone_scan(company_id: int):
@@ -358,7 +424,8 @@ async def _background_zone_scan(company_id: int):
     print(f"[zone-policy-scan] starting background scan for company_id={company_id}")
     try:
         policy_row = db.execute(
-            text("SELECT * FROM hedging_policies WHERE company_id = :cid AND is_active = true"),
+            text("SELECT zone_notify_email, adverse_trigger_pct, favourable_trigger_pct "
+                 "FROM hedging_policies WHERE company_id = :cid AND is_active = true"),
             {"cid": company_id}
         ).fetchone()
         if not policy_row:
@@ -595,6 +662,7 @@ async def update_zone_config(
     updates["id"] = policy_id
     db.execute(text(f"UPDATE hedging_policies SET {set_clause} WHERE id = :id"), updates)
     db.commit()
+    _invalidate_settings(safe_id)
 
     # If thresholds changed, immediately re-evaluate zones for all exposures.
     # Fire as a background task so the HTTP response returns instantly.
@@ -609,39 +677,63 @@ async def update_zone_config(
 @router.post("/policy/cascade")
 def cascade_policy(request: PolicyCascadeRequest, db: Session = Depends(get_db), payload: dict = Depends(get_token_payload)):
     safe_id = resolve_company_id(request.company_id, payload)
-    policy = db.execute(text("SELECT * FROM hedging_policies WHERE id = :id AND company_id = :cid"), {"id": request.policy_id, "cid": safe_id}).fetchone()
+    policy = db.execute(text(
+        "SELECT policy_name, hedge_ratio_over_5m, hedge_ratio_1m_to_5m, hedge_ratio_under_1m "
+        "FROM hedging_policies WHERE id = :id AND company_id = :cid"
+    ), {"id": request.policy_id, "cid": safe_id}).fetchone()
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found")
     p = policy._mapping
-    exposures = db.query(Exposure).filter(Exposure.company_id == safe_id).all()
-    updated = skipped = 0
-    for exp in exposures:
-        if getattr(exp, 'hedge_override', False):
-            skipped += 1
-            continue
-        amount_usd = exp.amount * (exp.current_rate or 1)
-        if amount_usd >= 5_000_000: new_ratio = float(p["hedge_ratio_over_5m"])
-        elif amount_usd >= 1_000_000: new_ratio = float(p["hedge_ratio_1m_to_5m"])
-        else: new_ratio = float(p["hedge_ratio_under_1m"])
-        exp.hedge_ratio_policy = new_ratio
-        exp.updated_at = datetime.utcnow()
-        updated += 1
-    db.execute(text("UPDATE hedging_policies SET is_active = false WHERE company_id = :cid"), {"cid": safe_id})
-    db.execute(text("UPDATE hedging_policies SET is_active = true WHERE id = :id"), {"id": request.policy_id})
+    # Tiered ratio evaluated server-side: one UPDATE instead of loading every
+    # Exposure and flushing a round trip per row. RETURNING counts the rows
+    # actually touched; overridden exposures are skipped in the WHERE clause.
+    updated = len(db.execute(text("""
+        UPDATE exposures
+        SET hedge_ratio_policy = CASE
+                WHEN amount * COALESCE(current_rate, 1) >= 5000000 THEN :r_over_5m
+                WHEN amount * COALESCE(current_rate, 1) >= 1000000 THEN :r_1m_to_5m
+                ELSE :r_under_1m
+            END,
+            updated_at = NOW()
+        WHERE company_id = :cid AND hedge_override IS NOT TRUE
+        RETURNING id
+    """), {
+        "r_over_5m": float(p["hedge_ratio_over_5m"]),
+        "r_1m_to_5m": float(p["hedge_ratio_1m_to_5m"]),
+        "r_under_1m": float(p["hedge_ratio_under_1m"]),
+        "cid": safe_id,
+    }).fetchall())
+    skipped = db.execute(text(
+        "SELECT COUNT(*) FROM exposures WHERE company_id = :cid AND hedge_override = true"
+    ), {"cid": safe_id}).scalar() or 0
+    # One scan flips both flags: deactivate everything except the chosen
+    # policy and activate it, instead of two sequential UPDATEs
+    db.execute(text(
+        "UPDATE hedging_policies SET is_active = (id = :id) WHERE company_id = :cid"
+    ), {"id": request.policy_id, "cid": safe_id})
     audit = PolicyAuditLog(company_id=safe_id, policy_id=request.policy_id, policy_name=p["policy_name"], changed_by=request.changed_by, exposures_updated=updated, exposures_skipped=skipped, notes=f"Cascaded to {updated} exposures. {skipped} manual overrides preserved.")
     db.add(audit)
     db.commit()
+    invalidate_plan_header(safe_id)  # active policy feeds the cached report header
+    _invalidate_settings(safe_id)
     return {"success": True, "policy_name": p["policy_name"], "exposures_updated": updated, "exposures_skipped": skipped, "message": f"Policy activated. {updated} exposures updated, {skipped} manual overrides preserved."}
 
 @router.post("/policy/cascade/preview")
 def preview_cascade(request: PolicyCascadeRequest, db: Session = Depends(get_db), payload: dict = Depends(get_token_payload)):
     safe_id = resolve_company_id(request.company_id, payload)
-    policy = db.execute(text("SELECT * FROM hedging_policies WHERE id = :id AND company_id = :cid"), {"id": request.policy_id, "cid": safe_id}).fetchone()
+    policy = db.execute(text(
+        "SELECT policy_name FROM hedging_policies WHERE id = :id AND company_id = :cid"
+    ), {"id": request.policy_id, "cid": safe_id}).fetchone()
     if not policy:
         raise HTTPException(status_code=404, detail="Policy not found")
-    exposures = db.query(Exposure).filter(Exposure.company_id == safe_id).all()
-    will_update = sum(1 for e in exposures if not getattr(e, 'hedge_override', False))
-    will_skip = sum(1 for e in exposures if getattr(e, 'hedge_override', False))
+    # Grouped count in SQL — no point hydrating full Exposure rows just to
+    # tally the override flag
+    counts = {row.ov: row.c for row in db.execute(text(
+        "SELECT COALESCE(hedge_override, false) AS ov, COUNT(*) AS c "
+        "FROM exposures WHERE company_id = :cid GROUP BY 1"
+    ), {"cid": safe_id}).all()}
+    will_update = counts.get(False, 0)
+    will_skip = counts.get(True, 0)
     p = policy._mapping
     return {"policy_name": p["policy_name"], "will_update": will_update, "will_skip": will_skip, "message": f"This will update {will_update} exposures. {will_skip} have manual overrides and will not change."}
 
@@ -649,7 +741,12 @@ def preview_cascade(request: PolicyCascadeRequest, db: Session = Depends(get_db)
 def set_hedge_override(request: HedgeOverrideRequest, db: Session = Depends(get_db), payload: dict = Depends(get_token_payload)):
     if not 0 <= request.hedge_ratio <= 1:
         raise HTTPException(status_code=400, detail="Hedge ratio must be between 0 and 1")
-    exp = db.query(Exposure).filter(Exposure.id == request.exposure_id).first()
+    # Only the columns this handler touches; raiseload turns any accidental
+    # lazy relationship access into a loud error instead of a hidden query
+    exp = db.query(Exposure).options(
+        load_only(Exposure.company_id, Exposure.hedge_ratio_policy, Exposure.hedge_override),
+        raiseload('*')
+    ).filter(Exposure.id == request.exposure_id).first()
     if not exp:
         raise HTTPException(status_code=404, detail="Exposure not found")
     safe_id = resolve_company_id(exp.company_id, payload)
@@ -663,7 +760,10 @@ def set_hedge_override(request: HedgeOverrideRequest, db: Session = Depends(get_
 
 @router.delete("/exposure/{exposure_id}/override")
 def clear_hedge_override(exposure_id: int, db: Session = Depends(get_db), payload: dict = Depends(get_token_payload)):
-    exp = db.query(Exposure).filter(Exposure.id == exposure_id).first()
+    exp = db.query(Exposure).options(
+        load_only(Exposure.company_id, Exposure.hedge_ratio_policy, Exposure.hedge_override),
+        raiseload('*')
+    ).filter(Exposure.id == exposure_id).first()
     if not exp:
         raise HTTPException(status_code=404, detail="Exposure not found")
     safe_id = resolve_company_id(exp.company_id, payload)
@@ -682,11 +782,7 @@ def get_audit_log(company_id: int, db: Session = Depends(get_db), payload: dict
 
 @router.get("/pairs/approved")
 def get_approved_pairs():
-    majors = sorted([p for p in APPROVED_PAIRS if "USD" in p and "/" in p and len(p) == 7 and p not in {"USD/MXN","USD/CNY","USD/BRL","USD/ZAR","USD/INR","USD/TRY","USD/NOK","USD/SEK"}])
-    nok_sek = sorted([p for p in APPROVED_PAIRS if "NOK" in p or "SEK" in p])
-    exotics = sorted(["USD/MXN","USD/CNY","USD/BRL","USD/ZAR","USD/INR","USD/TRY","USD/NOK","USD/SEK"])
-    minors = sorted([p for p in APPROVED_PAIRS if p not in majors and p not in nok_sek and p not in exotics])
-    return {"majors": majors, "minors": minors, "nok_sek_crosses": nok_sek, "liquid_exotics": exotics, "total": len(APPROVED_PAIRS)}
+    return _APPROVED_PAIRS_PAYLOAD
 
 
 @router.post("/close-account/request")
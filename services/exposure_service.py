@@ -1,12 +1,19 @@
+import os
+import numpy as np
 import pandas as pd
 from io import BytesIO
 from typing import Dict, List, Tuple
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 from models import APExposure, Tenant
 import uuid
 from datetime import datetime
 
 # Column mapping: Norwegian → English
+# Rows per INSERT during bulk ingest — bounds per-statement parameter count
+# and keeps RSS proportional to batch size rather than file size
+INSERT_BATCH_SIZE = int(os.getenv('EXPOSURE_INSERT_BATCH_SIZE', '500'))
+
 COLUMN_MAPPING = {
     'Bestillingsnr.': 'order_number',
     'Betalings-betingelser': 'payment_terms',
@@ -38,6 +45,48 @@ async def parse_csv(file_content: bytes) -> pd.DataFrame:
         raise ValueError(f"Failed to parse CSV: {str(e)}")
 
 
+def parse_csv_chunks(file_obj, chunksize: int = 10_000):
+    """
+    Stream-parse an uploaded CSV in fixed-size chunks.
+
+    Yields DataFrames of at most `chunksize` rows with the same column
+    renaming and type conversions as parse_csv, so memory stays bounded by
+    chunk size instead of file size.
+    """
+    try:
+        reader = pd.read_csv(file_obj, encoding='utf-8', skipinitialspace=True,
+                             chunksize=chunksize)
+        for chunk in reader:
+            chunk = chunk.rename(columns=COLUMN_MAPPING)
+
+            date_columns = ['order_date', 'invoice_date', 'due_date']
+            for col in date_columns:
+                if col in chunk.columns:
+                    chunk[col] = pd.to_datetime(chunk[col], errors='coerce')
+
+            chunk['amount'] = pd.to_numeric(chunk['amount'], errors='coerce')
+            yield chunk
+    except Exception as e:
+        raise ValueError(f"Failed to parse CSV: {str(e)}")
+
+
+def merge_summaries(accumulated: Dict, new: Dict) -> Dict:
+    """Combine per-chunk summaries from generate_summary into running totals"""
+    if accumulated is None:
+        return new
+
+    for key, per_currency in new['currencies'].items():
+        merged = accumulated['currencies'].setdefault(key, {})
+        for currency, value in per_currency.items():
+            merged[currency] = merged.get(currency, 0) + value
+
+    for key, value in new['classification'].items():
+        accumulated['classification'][key] = accumulated['classification'].get(key, 0) + value
+
+    accumulated['total_rows'] += new['total_rows']
+    return accumulated
+
+
 def get_supplier_history(tenant_id: str, supplier: str, db: Session) -> int:
     """Count historical invoices for a supplier"""
     count = db.query(APExposure).filter(
@@ -84,54 +133,101 @@ async def process_exposures(
     source_file: str,
     db: Session
 ) -> Tuple[List[Dict], Dict]:
-    """Process DataFrame and classify all exposures"""
-    classified_exposures = []
-    supplier_cache = {}
-    
-    for _, row in df.iterrows():
-        if pd.isna(row.get('amount')) or pd.isna(row.get('currency')):
-            continue
-        
-        supplier = row.get('supplier', 'Unknown')
-        
-        if supplier not in supplier_cache:
-            supplier_cache[supplier] = get_supplier_history(tenant_id, supplier, db)
-        supplier_count = supplier_cache[supplier]
-        
-        classification = classify_exposure(row.to_dict(), supplier_count)
-        
-        exposure_data = {
-    "tenant_id": tenant_id,
-    "order_number": row.get('order_number'),
-    "invoice_number": row.get('invoice_number'),
-    "supplier": supplier,
-    "amount": float(row['amount']),
-    "currency": row['currency'],
-    "order_date": row.get('order_date').isoformat() if pd.notna(row.get('order_date')) else None,
-    "invoice_date": row.get('invoice_date').isoformat() if pd.notna(row.get('invoice_date')) else None,
-    "due_date": row.get('due_date').isoformat() if pd.notna(row.get('due_date')) else None,
-    "payment_terms": row.get('payment_terms'),
-    "confidence_level": classification['confidence_level'],
-    "confidence_score": float(classification['confidence_score']),
-    "is_recurring": classification['is_recurring'],
-    "reasoning": classification['reasoning'],
-    "uploaded_by": uploaded_by,
-    "source_file_name": source_file
-}
-        
-        classified_exposures.append(exposure_data)
-    
+    """
+    Process DataFrame and classify all exposures.
+
+    Classification and record construction are vectorized with pandas/NumPy
+    column operations instead of a per-row Python loop, and supplier history
+    is fetched in one grouped query instead of one COUNT per supplier.
+    """
+    # Tolerate missing optional columns the same way row.get() used to
+    optional_cols = ['order_number', 'invoice_number', 'supplier', 'payment_terms',
+                     'order_date', 'invoice_date', 'due_date']
+    for col in optional_cols:
+        if col not in df.columns:
+            df[col] = None
+
+    valid = df[df['amount'].notna() & df['currency'].notna()].copy()
+    if valid.empty:
+        return [], generate_summary([])
+
+    valid['supplier'] = valid['supplier'].fillna('Unknown')
+
+    # One grouped COUNT for every distinct supplier in the file
+    suppliers = valid['supplier'].unique().tolist()
+    supplier_counts = dict(
+        db.query(APExposure.supplier, func.count(APExposure.id))
+        .filter(APExposure.tenant_id == tenant_id, APExposure.supplier.in_(suppliers))
+        .group_by(APExposure.supplier)
+        .all()
+    )
+    counts = valid['supplier'].map(supplier_counts).fillna(0).astype(int)
+
+    # Vectorized classification — same rules as classify_exposure()
+    committed = valid['invoice_number'].notna() & valid['due_date'].notna()
+    recurring = committed & (counts >= 100)
+
+    valid['confidence_level'] = np.where(committed, 'committed', 'forecast')
+    valid['confidence_score'] = np.where(committed, np.where(recurring, 0.85, 0.95), 0.50)
+    valid['is_recurring'] = recurring
+
+    committed_reason = pd.Series('Invoice exists with fixed due date', index=valid.index)
+    committed_reason = committed_reason.where(
+        ~recurring,
+        committed_reason + '; Recurring supplier (' + counts.astype(str) + ' historical invoices)'
+    )
+    valid['reasoning'] = committed_reason.where(
+        committed, 'Missing invoice or due date - forecasted exposure'
+    )
+
+    # Vectorized ISO-8601 formatting of the date columns
+    for col in ('order_date', 'invoice_date', 'due_date'):
+        parsed = pd.to_datetime(valid[col], errors='coerce')
+        valid[col] = parsed.dt.strftime('%Y-%m-%dT%H:%M:%S').where(parsed.notna(), None)
+
+    valid['amount'] = valid['amount'].astype(float)
+    valid['tenant_id'] = tenant_id
+    valid['uploaded_by'] = uploaded_by
+    valid['source_file_name'] = source_file
+
+    record_cols = ['tenant_id', 'order_number', 'invoice_number', 'supplier', 'amount',
+                   'currency', 'order_date', 'invoice_date', 'due_date', 'payment_terms',
+                   'confidence_level', 'confidence_score', 'is_recurring', 'reasoning',
+                   'uploaded_by', 'source_file_name']
+    records = valid[record_cols].astype(object)
+    classified_exposures = records.where(records.notna(), None).to_dict('records')
+
     summary = generate_summary(classified_exposures)
     return classified_exposures, summary
 
 
 def generate_summary(exposures: List[Dict]) -> Dict:
     """Generate summary statistics from classified exposures"""
+    # A chunk can legitimately contain no valid rows (subtotal/trailer rows
+    # in AP exports) — groupby on a columnless frame raises, so short-circuit
+    # with a well-formed zero summary that merge_summaries can accumulate.
+    if not exposures:
+        return {
+            "total_rows": 0,
+            "currencies": {'count': {}, 'sum': {}},
+            "classification": {
+                'committed': 0,
+                'probable': 0,
+                'forecast': 0,
+                'recurring_suppliers': 0,
+            },
+        }
+
     df = pd.DataFrame(exposures)
     
-    currency_summary = df.groupby('currency').agg({
-        'amount': ['count', 'sum']
-    }).to_dict()
+    # String keys throughout — the old .agg({'amount': ['count', 'sum']})
+    # form produced tuple dict keys (('amount', 'count'), …) that neither
+    # jsonable_encoder nor orjson can serialize, 500ing the upload response
+    grouped = df.groupby('currency')['amount']
+    currency_summary = {
+        'count': {ccy: int(v) for ccy, v in grouped.count().items()},
+        'sum': {ccy: float(v) for ccy, v in grouped.sum().items()},
+    }
     
     classification_summary = {
         'committed': len(df[df['confidence_level'] == 'committed']),
@@ -168,29 +264,34 @@ async def bulk_insert_exposures(exposures: List[Dict], db: Session) -> int:
         
         if duplicates_skipped > 0:
             print(f"⚠️  Skipped {duplicates_skipped} duplicate invoices within CSV")
-        
-        # Use bulk_insert_mappings for much faster insertion
-        from sqlalchemy import insert
-        
-        # Insert in batches of 500 to avoid overwhelming the database
-        batch_size = 500
+
+        # PostgreSQL dialect insert — the generic sqlalchemy.insert has no
+        # on_conflict_do_nothing, which made every batch fail and roll back.
+        from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+        # Insert in fixed-size batches to bound statement size and memory —
+        # tunable per deployment (driver parameter limits vary by dialect)
+        batch_size = INSERT_BATCH_SIZE
         inserted_count = 0
-        
+
         for i in range(0, len(unique_exposures), batch_size):
             batch = unique_exposures[i:i + batch_size]
-            
+
             try:
-                # Use insert().on_conflict_do_nothing() for PostgreSQL
-                stmt = insert(APExposure).values(batch)
-                # Skip duplicates that exist in database
-                stmt = stmt.on_conflict_do_nothing(
-                    index_elements=['tenant_id', 'invoice_number']
+                # One multi-VALUES INSERT per batch; RETURNING counts the rows
+                # actually inserted (conflicts with existing invoices return
+                # nothing) in the same round trip — no per-row ORM objects.
+                stmt = (
+                    pg_insert(APExposure)
+                    .values(batch)
+                    .on_conflict_do_nothing(index_elements=['tenant_id', 'invoice_number'])
+                    .returning(APExposure.id)
                 )
-                db.execute(stmt)
+                inserted_ids = db.execute(stmt).scalars().all()
                 db.commit()
-                inserted_count += len(batch)
-                print(f"📦 Inserted batch {i//batch_size + 1} ({len(batch)} records)")
-                
+                inserted_count += len(inserted_ids)
+                print(f"📦 Inserted batch {i//batch_size + 1} ({len(inserted_ids)} records)")
+
             except Exception as e:
                 db.rollback()
                 print(f"⚠️  Error in batch {i//batch_size + 1}: {str(e)}")
@@ -8,6 +8,10 @@ from datetime import datetime, timedelta
 from typing import Dict, List, Tuple
 import statistics
 
+# Per-scenario-type (shock ndarray, labels) built on first use — shared by all
+# service instances since scenario definitions are class constants
+_SCENARIO_CACHE: Dict[str, Tuple] = {}
+
 
 class HedgingService:
     """
@@ -231,6 +235,63 @@ class HedgingService:
             'summary': self._summarize_scenarios(results)
         }
     
+    def run_scenario_analysis_batched(
+        self,
+        exposure_amount: float,
+        current_rate: float,
+        hedge_ratios: List[float],
+        scenario_type: str = 'moderate'
+    ) -> List[Dict]:
+        """
+        Run scenario analysis for several hedge ratios in one vectorized pass.
+
+        Broadcasting hedge_ratios against the scenario shock vector computes
+        the whole (ratios x scenarios) P&L matrix in NumPy instead of one
+        Python loop per ratio — compare_strategies uses this so a 20-strategy
+        comparison costs one arithmetic pass.
+
+        Returns one dict per hedge ratio with the same shape as
+        run_scenario_analysis.
+        """
+        # Shock vector and labels depend only on the scenario type — build them
+        # once per type and reuse across requests
+        key = scenario_type if scenario_type in self.SCENARIOS else 'moderate'
+        cached = _SCENARIO_CACHE.get(key)
+        if cached is None:
+            shocks = np.asarray(self.SCENARIOS[key], dtype=float)
+            labels = [self._classify_scenario(shock) for shock in shocks]
+            _SCENARIO_CACHE[key] = cached = (shocks, labels)
+        shocks, labels = cached
+        ratios = np.asarray(hedge_ratios, dtype=float)
+
+        new_rates = current_rate * (1 + shocks)
+        unhedged_pnl = exposure_amount * (new_rates - current_rate)            # (S,)
+        hedged_pnl = (1.0 - ratios)[:, None] * unhedged_pnl[None, :]           # (R, S)
+        hedge_benefit = unhedged_pnl[None, :] - hedged_pnl                     # (R, S)
+
+        analyses = []
+        for i, ratio in enumerate(ratios):
+            results = []
+            for j, shock in enumerate(shocks):
+                results.append({
+                    'rate_change_pct': round(shock * 100, 1),
+                    'new_rate': round(new_rates[j], 6),
+                    'unhedged_pnl': round(unhedged_pnl[j], 2),
+                    'hedged_pnl': round(hedged_pnl[i, j], 2),
+                    'hedge_benefit': round(hedge_benefit[i, j], 2),
+                    'scenario': labels[j]
+                })
+            analyses.append({
+                'scenario_type': scenario_type,
+                'hedge_ratio': float(ratio),
+                'hedge_ratio_pct': f"{ratio * 100:.0f}%",
+                'current_rate': current_rate,
+                'exposure_amount': exposure_amount,
+                'scenarios': results,
+                'summary': self._summarize_scenarios(results)
+            })
+        return analyses
+
     def _classify_scenario(self, rate_change: float) -> str:
         """
         Classify scenario based on rate change magnitude
@@ -2,6 +2,9 @@
 Monte Carlo Simulation Service for FX Risk Analysis
 """
 
+import ctypes
+import ctypes.util
+
 import numpy as np
 import pandas as pd
 from typing import Dict, List, Optional
@@ -9,6 +12,27 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
 
+# glibc handle for malloc_trim — freed simulation arrays can linger in
+# allocator arenas instead of going back to the OS, so long-lived workers
+# trim periodically. None on non-glibc platforms (trim becomes a no-op).
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6")
+    _libc.malloc_trim
+except (OSError, AttributeError):
+    _libc = None
+
+_TRIM_EVERY = 32
+_sims_since_trim = 0
+
+
+def _maybe_trim_arenas() -> None:
+    """Return freed allocator arenas to the OS every _TRIM_EVERY simulations."""
+    global _sims_since_trim
+    _sims_since_trim += 1
+    if _libc is not None and _sims_since_trim >= _TRIM_EVERY:
+        _sims_since_trim = 0
+        _libc.malloc_trim(0)
+
 
 class RiskMetric(str, Enum):
     VAR_95 = "var_95"
@@ -62,13 +86,14 @@ class MonteCarloService:
         else:
             return 0.10
     
-    def run_simulation(self, current_rate: float, amount: float, time_horizon_days: int, 
-                      volatility: Optional[float] = None, num_scenarios: Optional[int] = None, 
-                      drift: float = 0.0, currency_pair: str = "UNKNOWN", random_seed: int = 42) -> Dict:
+    def run_simulation(self, current_rate: float, amount: float, time_horizon_days: int,
+                      volatility: Optional[float] = None, num_scenarios: Optional[int] = None,
+                      drift: float = 0.0, currency_pair: str = "UNKNOWN", random_seed: int = 42,
+                      keep_full_pnl: bool = False) -> Dict:
         """
         Run Monte Carlo simulation for a single exposure
-        Returns both API-safe data and internal full arrays
-        
+        Returns API-safe data; the full P&L vector only when requested
+
         Args:
             current_rate: Current FX rate (must be > 0)
             amount: Exposure amount (must be != 0)
@@ -78,7 +103,10 @@ class MonteCarloService:
             drift: Drift parameter
             currency_pair: Currency pair identifier
             random_seed: Random seed for reproducibility (default: 42)
-            
+            keep_full_pnl: Include '_internal_full_pnl' in the result — only
+                portfolio aggregation needs it; API callers should leave it off
+                so the full vector never reaches serialization
+
         Raises:
             ValueError: If inputs fail validation
         """
@@ -97,22 +125,23 @@ class MonteCarloService:
         dt = 1 / 252
         num_steps = time_horizon_days
         
-        # Initialize rate paths
-        rate_paths = np.zeros((num_scenarios, num_steps + 1))
-        rate_paths[:, 0] = current_rate
-        
         # Generate random shocks with configurable seed
         np.random.seed(random_seed)
         shocks = np.random.normal(0, 1, (num_scenarios, num_steps))
-        
-        # Simulate rate paths
-        for t in range(num_steps):
-            rate_paths[:, t + 1] = rate_paths[:, t] * np.exp(
-                (drift - 0.5 * volatility**2) * dt + volatility * np.sqrt(dt) * shocks[:, t]
-            )
-        
+
+        # Terminal rates in closed form: the product of per-step exp() factors
+        # equals exp() of the summed increments, so the whole GBM walk reduces
+        # to one row-sum and one exp over the scenario vector — no Python-level
+        # step loop. Same shocks, same terminal distribution.
+        log_increments = (drift - 0.5 * volatility**2) * dt * num_steps \
+            + volatility * np.sqrt(dt) * shocks.sum(axis=1)
+        # The shocks matrix is the dominant allocation (scenarios × days
+        # float64) and is only needed for the row-sum — release it before
+        # building the remaining per-scenario vectors
+        del shocks
+        final_rates = current_rate * np.exp(log_increments)
+
         # Calculate final outcomes
-        final_rates = rate_paths[:, -1]
         initial_value_usd = amount * current_rate
         final_values_usd = amount * final_rates
         pnl = final_values_usd - initial_value_usd
@@ -136,7 +165,7 @@ class MonteCarloService:
         percentile_95 = np.percentile(final_rates, 95)
         
         # Return API-safe dictionary
-        return {
+        result = {
             'simulation_params': {
                 'current_rate': current_rate,
                 'amount': amount,
@@ -147,9 +176,11 @@ class MonteCarloService:
                 'currency_pair': currency_pair
             },
             'outcomes': {
-                'simulated_rates': final_rates.tolist()[:100],
-                'simulated_values_usd': final_values_usd.tolist()[:100],
-                'simulated_pnl': pnl.tolist()[:100]
+                # Slice before tolist — converting the full scenario vectors to
+                # Python lists just to keep 100 samples costs ~1000x the work
+                'simulated_rates': final_rates[:100].tolist(),
+                'simulated_values_usd': final_values_usd[:100].tolist(),
+                'simulated_pnl': pnl[:100].tolist()
             },
             'risk_metrics': {
                 'var_95': float(var_95),
@@ -174,56 +205,67 @@ class MonteCarloService:
                 'expected_pnl': float(np.mean(pnl)),
                 'downside_risk_95': float(abs(var_95)),
                 'upside_potential_95': float(max_gain * 0.95)
-            },
-            '_internal_full_pnl': pnl
+            }
         }
+        if keep_full_pnl:
+            result['_internal_full_pnl'] = pnl
+        _maybe_trim_arenas()
+        return result
     
-    def run_portfolio_simulation(self, exposures: List[Dict], time_horizon_days: int = 90, 
+    def run_portfolio_simulation(self, exposure_ids: List[int], amounts: np.ndarray,
+                                current_rates: np.ndarray, currency_pairs: List[str],
+                                time_horizon_days: int = 90,
                                 num_scenarios: Optional[int] = None, random_seed: int = 42) -> Dict:
         """
         Run Monte Carlo simulation for entire portfolio
         Aggregates risk across all exposures
-        
+
+        Inputs are parallel columns (struct-of-arrays) rather than a list of
+        per-exposure dicts — callers can fill the float columns straight from
+        a query result with np.fromiter, skipping N dict allocations.
+
         Args:
-            exposures: List of exposure dicts with 'current_rate', 'amount', 'currency_pair', 'id'
+            exposure_ids: Exposure ids, aligned with the other columns
+            amounts: Exposure amounts as a float64 array
+            current_rates: Current FX rates as a float64 array
+            currency_pairs: Currency pair per exposure
             time_horizon_days: Time horizon in days
             num_scenarios: Optional number of scenarios
             random_seed: Random seed for reproducibility (default: 42)
-            
+
         Raises:
             ValueError: If inputs fail validation
         """
         if not (1 <= time_horizon_days <= 365):
             raise ValueError(f"time_horizon_days must be between 1 and 365, got {time_horizon_days}")
-        
+
         num_scenarios = num_scenarios or self.default_scenarios
-        
+
         individual_results = []
         portfolio_pnl = np.zeros(num_scenarios)
-        
-        for idx, exp in enumerate(exposures):
+
+        for idx, (exp_id, amount, rate, pair) in enumerate(
+                zip(exposure_ids, amounts, current_rates, currency_pairs)):
             # Run simulation for this exposure with incremented seed for variation
             result = self.run_simulation(
-                current_rate=exp['current_rate'],
-                amount=exp['amount'],
+                current_rate=float(rate),
+                amount=float(amount),
                 time_horizon_days=time_horizon_days,
                 num_scenarios=num_scenarios,
-                currency_pair=exp.get('currency_pair', 'UNKNOWN'),
-                random_seed=random_seed + idx  # Vary seed for each exposure
+                currency_pair=pair,
+                random_seed=random_seed + idx,  # Vary seed for each exposure
+                keep_full_pnl=True
             )
-            
+
+            # Aggregate portfolio P&L, popping the full array so the stored
+            # result is API-safe without a caller-side cleanup pass
+            portfolio_pnl += result.pop('_internal_full_pnl')
+
             individual_results.append({
-                'exposure_id': exp.get('id'),
-                'currency_pair': exp.get('currency_pair'),
+                'exposure_id': exp_id,
+                'currency_pair': pair,
                 'result': result
             })
-            
-            # Aggregate portfolio P&L using internal full array
-            if '_internal_full_pnl' in result:
-                portfolio_pnl += result['_internal_full_pnl']
-            else:
-                # Fallback if internal array not available
-                portfolio_pnl += np.array(result['outcomes']['simulated_pnl'])
         
         # Calculate portfolio-level risk metrics
         portfolio_var_95 = np.percentile(portfolio_pnl, 5)
@@ -237,7 +279,7 @@ class MonteCarloService:
         
         return {
             'portfolio_metrics': {
-                'total_exposures': len(exposures),
+                'total_exposures': len(exposure_ids),
                 'time_horizon_days': time_horizon_days,
                 'num_scenarios': num_scenarios,
                 'var_95': float(portfolio_var_95),
@@ -258,5 +300,5 @@ class MonteCarloService:
                 'percentile_95': float(np.percentile(portfolio_pnl, 95))
             },
             'individual_exposures': individual_results,
-            'sample_portfolio_pnl': portfolio_pnl.tolist()[:100]
+            'sample_portfolio_pnl': portfolio_pnl[:100].tolist()
         }
\ No newline at end of file
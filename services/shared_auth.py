@@ -17,6 +17,8 @@ Cipher has signed off the removal.
 """
 
 import os
+import time
+from functools import lru_cache
 from typing import Optional
 
 from fastapi import Cookie, Depends, HTTPException
@@ -30,6 +32,22 @@ SECRET_KEY = os.getenv(
 )
 
 
+@lru_cache(maxsize=4096)
+def _decode_token(token: str) -> dict:
+    """
+    HMAC-verify and decode a token once per unique token string.
+
+    Every protected endpoint re-ran the HMAC-SHA256 + JSON parse even when the
+    same client token hits many endpoints per second; the decoded payload is
+    immutable for a given token, so it is safe to memoize. Expiry is checked by
+    the caller on every request (a cached hit must still respect exp), and
+    failed decodes raise, so lru_cache never stores invalid tokens.
+    """
+    from jose import jwt
+
+    return jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+
+
 def get_token_payload(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(_security),
     access_token: Optional[str] = Cookie(default=None),
@@ -41,12 +59,18 @@ def get_token_payload(
     Bearer header remains accepted during the BF-002 transition window — remove
     once WS auth is resolved and all clients confirmed on cookie model.
     """
-    from jose import JWTError, jwt
+    from jose import JWTError
 
     token = access_token or (credentials.credentials if credentials else None)
     if not token:
         raise HTTPException(status_code=401, detail="Authentication required")
     try:
-        return jwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+        payload = _decode_token(token)
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid or expired token")
+    # jose only checks exp at decode time; a cached payload outlives that
+    # check, so re-validate here on every request.
+    exp = payload.get("exp")
+    if exp is not None and exp < time.time():
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return payload
@@ -6,6 +6,7 @@ Tests input validation and database persistence
 
 import sys
 import asyncio
+import numpy as np
 from services.monte_carlo_service import MonteCarloService
 
 def test_monte_carlo_service():
@@ -128,12 +129,11 @@ def test_monte_carlo_service():
     # Test 7: Portfolio simulation
     print("\n✓ Test 7: Portfolio simulation with multiple exposures")
     try:
-        exposures = [
-            {'id': 1, 'current_rate': 1.1234, 'amount': 1000000, 'currency_pair': 'EUR/USD'},
-            {'id': 2, 'current_rate': 130.45, 'amount': 500000, 'currency_pair': 'JPY/USD'},
-        ]
         result = service.run_portfolio_simulation(
-            exposures=exposures,
+            exposure_ids=[1, 2],
+            amounts=np.array([1000000.0, 500000.0]),
+            current_rates=np.array([1.1234, 130.45]),
+            currency_pairs=['EUR/USD', 'JPY/USD'],
             time_horizon_days=90,
             num_scenarios=1000,
             random_seed=42
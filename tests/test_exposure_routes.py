@@ -0,0 +1,126 @@
+"""
+Regression tests for the AP exposure upload pipeline.
+
+A chunk whose rows all lack amount/currency (subtotal and trailer rows are
+common in AP exports) once crashed generate_summary mid-upload, turning the
+whole request into a 500 after earlier chunks had already committed.
+"""
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import asyncio
+
+import pandas as pd
+
+
+_EMPTY_CLASSIFICATION = {
+    'committed': 0, 'probable': 0, 'forecast': 0, 'recurring_suppliers': 0,
+}
+
+
+def test_generate_summary_empty_list():
+    from services.exposure_service import generate_summary
+    summary = generate_summary([])
+    assert summary == {
+        "total_rows": 0,
+        "currencies": {"count": {}, "sum": {}},
+        "classification": _EMPTY_CLASSIFICATION,
+    }
+
+
+def test_process_exposures_all_invalid_chunk():
+    """An all-invalid chunk yields no records and a zero summary — no crash."""
+    from services.exposure_service import process_exposures
+
+    df = pd.DataFrame({
+        'amount': [None, float('nan')],
+        'currency': [None, None],
+        'supplier': ['Subtotal', 'Trailer'],
+    })
+    exposures, summary = asyncio.run(process_exposures(
+        df=df, tenant_id="t-1", uploaded_by="tester@example.com",
+        source_file="ap.csv", db=None,  # empty branch returns before any query
+    ))
+    assert exposures == []
+    assert summary["total_rows"] == 0
+    assert summary["classification"] == _EMPTY_CLASSIFICATION
+
+
+def test_merge_summaries_accepts_empty_chunk_summary():
+    from services.exposure_service import generate_summary, merge_summaries
+
+    accumulated = merge_summaries(None, generate_summary([]))
+    accumulated = merge_summaries(accumulated, generate_summary([]))
+    assert accumulated["total_rows"] == 0
+    assert accumulated["currencies"] == {"count": {}, "sum": {}}
+
+
+def test_upload_endpoint_round_trip():
+    """Full request through POST /api/exposures/upload.
+
+    Pins that the success response actually serializes — the tuple dict
+    keys the summary used to carry 500ed every successful upload after the
+    rows had already been committed.
+    """
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    import routes.exposure_routes as mod
+
+    class FakeQuery:
+        def filter(self, *args, **kwargs):
+            return self
+
+        def group_by(self, *args):
+            return self
+
+        def all(self):
+            return []  # no supplier history
+
+    class FakeResult:
+        def __init__(self, ids):
+            self._ids = ids
+
+        def scalars(self):
+            return self
+
+        def all(self):
+            return self._ids
+
+    class FakeDB:
+        def query(self, *args, **kwargs):
+            return FakeQuery()
+
+        def execute(self, stmt):
+            return FakeResult([1, 2])
+
+        def commit(self):
+            pass
+
+        def rollback(self):
+            pass
+
+    app = FastAPI()
+    app.include_router(mod.router)
+    app.dependency_overrides[mod.get_db] = lambda: FakeDB()
+
+    csv_body = (
+        "Bestillingsnr.,Fakturanr.,Fakturadato,Forfallsdato,Kredit,Valuta,Leverandør\n"
+        "PO-1,INV-1,2026-01-01,2026-03-01,1000,EUR,Acme\n"
+        "PO-2,INV-2,2026-01-02,2026-03-02,2000,USD,Beta\n"
+        "Sum,,,,,,\n"
+    )
+    client = TestClient(app)
+    resp = client.post(
+        "/api/exposures/upload",
+        files={"file": ("ap.csv", csv_body, "text/csv")},
+        data={"tenant_id": "t-1", "uploaded_by": "tester@example.com"},
+    )
+
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["success"] is True
+    assert body["summary"]["total_rows"] == 2
+    assert body["summary"]["currencies"]["count"] == {"EUR": 1, "USD": 1}
+    assert body["summary"]["currencies"]["sum"] == {"EUR": 1000.0, "USD": 2000.0}
+    assert body["summary"]["classification"]["committed"] == 2
+    assert len(body["preview"]) == 2
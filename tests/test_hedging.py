@@ -0,0 +1,206 @@
+"""
+Golden-input tests for HedgingService.
+Scenario P&L convention: positive = rate moved in the company's favour on
+the unhedged portion; hedged portion is locked at current_rate (P&L 0).
+"""
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from datetime import datetime, timedelta
+
+from services.hedging_service import HedgingService
+
+service = HedgingService()
+
+
+# ── Optimal hedge ratio ──────────────────────────────────────────────────────
+
+def test_low_risk_tolerance_full_hedge():
+    """Low tolerance always recommends a 100% hedge at 99% confidence."""
+    rec = service.calculate_optimal_hedge_ratio(
+        exposure_amount=1_000_000, current_rate=1.0850,
+        historical_volatility=0.08, time_horizon_days=90, risk_tolerance='low'
+    )
+    assert rec['recommended_ratio'] == 1.0
+    assert rec['confidence_level'] == 99
+    assert 'Full hedge' in rec['rationale']
+    assert len(rec['hedge_analysis']) == len(HedgingService.HEDGE_RATIOS)
+
+
+def test_moderate_tolerance_caps_at_75_pct():
+    """With extreme volatility the moderate recommendation caps at 0.75."""
+    rec = service.calculate_optimal_hedge_ratio(
+        exposure_amount=1_000_000, current_rate=1.0850,
+        historical_volatility=0.90, time_horizon_days=365, risk_tolerance='moderate'
+    )
+    assert rec['recommended_ratio'] == 0.75
+    assert rec['confidence_level'] == 95
+    assert 'Substantial hedge' in rec['rationale']
+
+
+def test_moderate_tolerance_low_volatility_minimal_hedge():
+    """Calm markets: moderate tolerance recommends only covering 95% VaR."""
+    rec = service.calculate_optimal_hedge_ratio(
+        exposure_amount=1_000_000, current_rate=1.0850,
+        historical_volatility=0.08, time_horizon_days=90, risk_tolerance='moderate'
+    )
+    assert rec['recommended_ratio'] < 0.4
+    assert 'Minimal hedge' in rec['rationale']
+
+
+def test_high_risk_tolerance_half_hedge():
+    rec = service.calculate_optimal_hedge_ratio(
+        exposure_amount=1_000_000, current_rate=1.0850,
+        historical_volatility=0.08, time_horizon_days=90, risk_tolerance='high'
+    )
+    assert rec['recommended_ratio'] == 0.5
+    assert rec['confidence_level'] == 90
+    assert 'Moderate hedge' in rec['rationale']
+
+
+def test_hedge_analysis_amounts_split():
+    """Each analysed ratio splits the exposure into hedged/unhedged parts."""
+    rec = service.calculate_optimal_hedge_ratio(
+        exposure_amount=1_000_000, current_rate=1.0850,
+        historical_volatility=0.08, time_horizon_days=90, risk_tolerance='low'
+    )
+    half = next(a for a in rec['hedge_analysis'] if a['ratio'] == 0.50)
+    assert half['hedged_amount'] == 500_000.00
+    assert half['unhedged_amount'] == 500_000.00
+    assert half['worst_case_pnl'] == -half['best_case_pnl']
+
+
+# ── Scenario analysis ────────────────────────────────────────────────────────
+
+def test_scenario_analysis_golden_numbers():
+    """
+    1M exposure, rate 1.0850, 50% hedged, moderate (+/-10%, +/-5%, 0).
+    At +10%: unhedged P&L = 1,000,000 x 0.1085 = 108,500; hedged = 54,250.
+    """
+    result = service.run_scenario_analysis(
+        exposure_amount=1_000_000, current_rate=1.0850,
+        hedge_ratio=0.50, scenario_type='moderate'
+    )
+    up10 = next(s for s in result['scenarios'] if s['rate_change_pct'] == 10.0)
+    assert up10['unhedged_pnl'] == 108_500.00
+    assert up10['hedged_pnl'] == 54_250.00
+    assert up10['hedge_benefit'] == 54_250.00
+    assert result['summary']['total_scenarios'] == 5
+
+
+def test_scenario_classification_aggressive_covers_all_bands():
+    """Aggressive shocks span Severe Adverse through Severe Favorable."""
+    result = service.run_scenario_analysis(
+        exposure_amount=1_000_000, current_rate=1.0850,
+        hedge_ratio=0.0, scenario_type='aggressive'
+    )
+    labels = [s['scenario'] for s in result['scenarios']]
+    assert labels == [
+        'Severe Adverse', 'Severe Adverse', 'Moderate Adverse', 'No Change',
+        'Mild Favorable', 'Moderate Favorable', 'Severe Favorable',
+    ]
+
+
+def test_unknown_scenario_type_falls_back_to_moderate():
+    result = service.run_scenario_analysis(
+        exposure_amount=1_000_000, current_rate=1.0850,
+        hedge_ratio=0.25, scenario_type='does-not-exist'
+    )
+    assert result['summary']['total_scenarios'] == 5
+
+
+def test_batched_matches_per_ratio_analysis():
+    """The vectorized batch must reproduce run_scenario_analysis exactly."""
+    ratios = [0.0, 0.25, 0.50, 1.0]
+    batched = service.run_scenario_analysis_batched(
+        exposure_amount=2_500_000, current_rate=11.40,
+        hedge_ratios=ratios, scenario_type='aggressive'
+    )
+    for ratio, analysis in zip(ratios, batched):
+        single = service.run_scenario_analysis(
+            exposure_amount=2_500_000, current_rate=11.40,
+            hedge_ratio=ratio, scenario_type='aggressive'
+        )
+        assert analysis['scenarios'] == single['scenarios']
+        assert analysis['summary'] == single['summary']
+        assert analysis['hedge_ratio_pct'] == single['hedge_ratio_pct']
+
+
+# ── P&L impact ───────────────────────────────────────────────────────────────
+
+def test_pnl_impact_golden_numbers():
+    """
+    1M exposure, contract 1.08, spot 1.0950, 75% hedged.
+    Hedged P&L: 750,000 x 0.015 = 11,250; unhedged baseline 15,000.
+    """
+    pnl = service.calculate_pnl_impact(
+        exposure_amount=1_000_000, contract_rate=1.0800,
+        current_rate=1.0950, hedge_ratio=0.75
+    )
+    assert pnl['hedged_pnl'] == 11_250.00
+    assert pnl['unhedged_pnl'] == 15_000.00
+    assert pnl['opportunity_impact'] == -3_750.00
+    assert pnl['hedge_effectiveness'] == 'Ineffective'
+
+
+def test_pnl_impact_flat_rate_is_neutral():
+    pnl = service.calculate_pnl_impact(
+        exposure_amount=1_000_000, contract_rate=1.0800,
+        current_rate=1.0800, hedge_ratio=0.50
+    )
+    assert pnl['hedged_pnl'] == 0.0
+    assert pnl['hedge_effectiveness'] == 'Neutral'
+
+
+# ── Rollover recommendation ──────────────────────────────────────────────────
+
+def test_rollover_far_from_maturity_monitors():
+    rec = service.recommend_rollover(
+        maturity_date=datetime.now() + timedelta(days=60),
+        current_exposure=500_000, market_outlook='neutral'
+    )
+    assert rec['recommendation'] == 'Monitor'
+    assert rec['urgency'] == 'Low'
+
+
+def test_rollover_bearish_inside_30_days():
+    rec = service.recommend_rollover(
+        maturity_date=datetime.now() + timedelta(days=15),
+        current_exposure=500_000, market_outlook='bearish'
+    )
+    assert rec['recommendation'] == 'Roll Over Early'
+    assert rec['urgency'] == 'Medium'
+
+
+def test_rollover_bullish_inside_30_days():
+    rec = service.recommend_rollover(
+        maturity_date=datetime.now() + timedelta(days=15),
+        current_exposure=500_000, market_outlook='bullish'
+    )
+    assert rec['recommendation'] == 'Let Mature'
+
+
+def test_rollover_neutral_inside_30_days():
+    rec = service.recommend_rollover(
+        maturity_date=datetime.now() + timedelta(days=15),
+        current_exposure=500_000, market_outlook='neutral'
+    )
+    assert rec['recommendation'] == 'Prepare to Roll'
+
+
+def test_rollover_at_maturity_with_open_exposure():
+    rec = service.recommend_rollover(
+        maturity_date=datetime.now() + timedelta(days=3),
+        current_exposure=500_000, market_outlook='neutral'
+    )
+    assert rec['recommendation'] == 'Take Action Now'
+    assert rec['action'] == 'Roll over to maintain hedge protection'
+    assert rec['urgency'] == 'High'
+
+
+def test_rollover_at_maturity_without_exposure():
+    rec = service.recommend_rollover(
+        maturity_date=datetime.now() + timedelta(days=3),
+        current_exposure=0, market_outlook='neutral'
+    )
+    assert rec['action'] == 'Allow to mature if exposure has reduced'
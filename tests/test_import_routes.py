@@ -0,0 +1,129 @@
+"""
+Regression tests for the data-import router.
+
+The router module once shipped with a constructor-argument typo that made
+it fail to import, 404ing every /api/exposure-data route. These tests keep
+the module importable and pin the manual-exposure validation kernel.
+"""
+import sys, os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+from fastapi import HTTPException
+
+
+def test_router_module_imports():
+    """The module must import cleanly — a SyntaxError here kills every route."""
+    import routes.data_import_routes_fastapi as mod
+    assert mod.router.prefix == "/api/exposure-data"
+
+
+def _make_request(**overrides):
+    from routes.data_import_routes_fastapi import ManualExposureRequest
+    payload = {
+        "company_id": 1,
+        "reference_number": "REF-001",
+        "currency_pair": "EUR/USD",
+        "amount": 1_000_000,
+        "start_date": "2026-09-01",
+        "end_date": "2026-12-01",
+    }
+    payload.update(overrides)
+    return ManualExposureRequest(**payload)
+
+
+def test_parse_pair_accepts_all_separators():
+    from routes.data_import_routes_fastapi import parse_pair
+    assert parse_pair("EUR/USD") == ("EUR", "USD")
+    assert parse_pair("eur-usd") == ("EUR", "USD")
+    assert parse_pair("EURUSD") == ("EUR", "USD")
+    assert parse_pair("EURO/USD") is None
+
+
+def test_validate_manual_exposure_parses_pair_and_dates():
+    from routes.data_import_routes_fastapi import _validate_manual_exposure
+    parsed = _validate_manual_exposure(_make_request())
+    assert parsed["from_currency"] == "EUR"
+    assert parsed["to_currency"] == "USD"
+    assert parsed["period_days"] == 91
+
+
+def test_validate_manual_exposure_rejects_bad_pair():
+    from routes.data_import_routes_fastapi import _validate_manual_exposure
+    with pytest.raises(HTTPException) as exc:
+        _validate_manual_exposure(_make_request(currency_pair="EURO/USD"))
+    assert exc.value.status_code == 400
+
+
+def test_validate_manual_exposure_rejects_inverted_dates():
+    from routes.data_import_routes_fastapi import _validate_manual_exposure
+    with pytest.raises(HTTPException) as exc:
+        _validate_manual_exposure(_make_request(start_date="2026-12-01", end_date="2026-09-01"))
+    assert exc.value.status_code == 400
+
+
+def test_upload_imports_workbook_rows(monkeypatch):
+    """End-to-end through the /upload handler with a real in-memory workbook.
+
+    Regression guard: a variable-shadowing bug once emptied the parsed row
+    list before the validation loop ran, so every upload reported success
+    with imported=0. This pins imported > 0 for a valid two-row file.
+    """
+    import asyncio
+    import io
+    import openpyxl
+    from fastapi import UploadFile
+    import routes.data_import_routes_fastapi as mod
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Exposures"
+    ws.append(["currency_pair", "description", "start_date", "maturity_date",
+               "total_amount", "budget_rate", "instrument_type", "base_currency"])
+    ws.append(["EUR/USD", "Coffee Q1", "2027-01-01", "2027-06-01", 1_000_000, 1.08, "Forward", "EUR"])
+    ws.append(["GBPUSD", "", "2027-02-01", "2027-07-01", 500_000, 1.26, "Spot", ""])
+    buf = io.BytesIO()
+    wb.save(buf)
+    buf.seek(0)
+
+    monkeypatch.setattr(mod, "get_live_fx_rate", lambda f, t: 1.1)
+
+    class FakeRequest:
+        headers = {"content-length": str(buf.getbuffer().nbytes)}
+
+    class FakeDB:
+        def __init__(self):
+            self.inserted = []
+
+        def get(self, model, pk):
+            return object()  # company exists
+
+        def execute(self, stmt, params=None):
+            if isinstance(params, list):
+                self.inserted.extend(params)
+
+        def flush(self):
+            pass
+
+        def commit(self):
+            pass
+
+        def rollback(self):
+            pass
+
+    db = FakeDB()
+    result = asyncio.run(mod.upload_file(
+        request=FakeRequest(),
+        file=UploadFile(file=buf, filename="import.xlsx"),
+        company_id=1,
+        db=db,
+        payload={"role": "superadmin"},
+    ))
+
+    assert result["success"] is True
+    assert result["imported"] == 2
+    assert result["skipped"] == 0
+    assert result["errors"] == []
+    assert len(db.inserted) == 2
+    assert db.inserted[0]["from_ccy"] == "EUR"
+    assert db.inserted[1]["from_ccy"] == "GBP"